@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-19 14:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_user_last_login_alter_user_role'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='skills',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-19 14:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0007_user_skills'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='user',
+            name='role',
+            field=models.CharField(choices=[('admin', 'Admin'), ('support_staff', 'Support Staff'), ('customer', 'Customer')], db_index=True, default='customer', max_length=15),
+        ),
+    ]
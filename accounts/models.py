@@ -1,5 +1,6 @@
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 from django.db import models
+from django.db.models.functions import Lower
 
 
 class UserManager(BaseUserManager):
@@ -41,12 +42,33 @@ class User(AbstractUser):
     email = models.EmailField(unique=True, db_index=True)
     first_name = models.CharField(max_length=30, blank=True, null=True)
     last_name = models.CharField(max_length=30, blank=True, null=True)
-    role = models.CharField(max_length=15, choices=ROLES, default='customer')
+    role = models.CharField(max_length=15, choices=ROLES, default='customer', db_index=True)
+    skills = models.JSONField(default=list, blank=True)
 
     objects = UserManager()
 
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = []
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Lets import_customers find existing accounts regardless of case.
+            models.Index(Lower("email"), name="accounts_user_email_lower"),
+        ]
+
     def __str__(self):
         return f"{self.email} ({self.role})"
+
+
+class RevokedToken(models.Model):
+    """
+    A refresh or access token that must no longer be accepted, identified by
+    its jti claim. Rows can be deleted once the token has expired anyway.
+    """
+    jti = models.CharField(max_length=255, unique=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="revoked_tokens")
+    expires_at = models.DateTimeField(db_index=True)
+    revoked_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.jti} ({self.user_id})"
@@ -0,0 +1,78 @@
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+
+# Revocations are re-read with this much overlap so rows committed late by
+# another worker (or stamped by a slightly skewed clock) are not missed.
+REFRESH_OVERLAP = timedelta(seconds=30)
+PURGE_INTERVAL = 60
+
+
+class RevocationList:
+    """
+    In-process copy of the RevokedToken table, keyed by jti.
+
+    Lookups are a dict membership test and never touch the database. At most
+    once every TOKEN_REVOCATION_REFRESH_SECONDS a lookup pulls the rows revoked
+    since the previous refresh, so a revocation made by any worker is honoured
+    everywhere within that interval. Expired entries are dropped periodically
+    since their tokens are rejected on expiry anyway.
+    """
+
+    def __init__(self):
+        self._expiry_by_jti = {}
+        self._lock = threading.Lock()
+        self._since = None
+        self._next_refresh = 0.0
+        self._next_purge = 0.0
+
+    def is_revoked(self, jti):
+        if time.monotonic() >= self._next_refresh:
+            self.refresh()
+        return jti in self._expiry_by_jti
+
+    def refresh(self):
+        from .models import RevokedToken
+
+        # Only one thread refreshes; the others keep using the current copy.
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            started = timezone.now()
+            revoked = RevokedToken.objects.filter(expires_at__gt=started)
+            if self._since is not None:
+                revoked = revoked.filter(revoked_at__gte=self._since - REFRESH_OVERLAP)
+            for jti, expires_at in revoked.values_list("jti", "expires_at"):
+                self._expiry_by_jti[jti] = expires_at.timestamp()
+
+            now = time.monotonic()
+            if now >= self._next_purge:
+                cutoff = time.time()
+                self._expiry_by_jti = {
+                    jti: expires
+                    for jti, expires in list(self._expiry_by_jti.items())
+                    if expires > cutoff
+                }
+                self._next_purge = now + PURGE_INTERVAL
+            self._since = started
+            self._next_refresh = now + settings.TOKEN_REVOCATION_REFRESH_SECONDS
+        finally:
+            self._lock.release()
+
+    def revoke(self, token):
+        """Records the revocation of a validated token and applies it locally at once."""
+        from .models import RevokedToken
+
+        jti = token[api_settings.JTI_CLAIM]
+        expires_at = datetime.fromtimestamp(token["exp"], tz=dt_timezone.utc)
+        RevokedToken.objects.get_or_create(
+            jti=jti, defaults={"user_id": token[api_settings.USER_ID_CLAIM], "expires_at": expires_at}
+        )
+        self._expiry_by_jti[jti] = expires_at.timestamp()
+
+
+REVOKED_TOKENS = RevocationList()
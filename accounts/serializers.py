@@ -1,14 +1,27 @@
 from rest_framework import serializers
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from service_requests.models import ServiceRequest
 from .models import User
+from .tokens import RevocableRefreshToken
 
 
 class UserSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = User
-        fields = ['first_name','last_name','id', 'email', 'password', 'role']
+        fields = ['first_name','last_name','id', 'email', 'password', 'role', 'skills']
         extra_kwargs = {'password': {'write_only': True}}
 
+    def validate_skills(self, value):
+        service_types = {choice[0] for choice in ServiceRequest.SERVICE_TYPES}
+        if not isinstance(value, list) or not all(skill in service_types for skill in value):
+            raise serializers.ValidationError(f"Skills must be a list of service types: {sorted(service_types)}.")
+        return value
+
     def create(self, validated_data):
         user = User.objects.create_user(**validated_data)
         return user
+
+
+class RevocableTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = RevocableRefreshToken
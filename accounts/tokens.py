@@ -0,0 +1,50 @@
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from .revocation import REVOKED_TOKENS
+
+_authentication = JWTAuthentication()
+
+
+class RevocationCheckMixin:
+    """Rejects tokens whose jti is on the revocation list."""
+
+    def verify(self):
+        super().verify()
+        if REVOKED_TOKENS.is_revoked(self.payload.get(api_settings.JTI_CLAIM)):
+            raise TokenError("Token has been revoked")
+
+
+class RevocableAccessToken(RevocationCheckMixin, AccessToken):
+    pass
+
+
+class RevocableRefreshToken(RevocationCheckMixin, RefreshToken):
+    access_token_class = RevocableAccessToken
+
+
+def get_token_user_id(request):
+    """
+    Returns the user id carried by a valid access token on a plain Django request,
+    or None. Only the token signature is checked, the database is never hit, so
+    middleware can identify callers before the DRF view authenticates them.
+    """
+    if hasattr(request, "_token_user_id"):
+        return request._token_user_id
+
+    user_id = None
+    header = _authentication.get_header(request)
+    if header is not None:
+        try:
+            raw_token = _authentication.get_raw_token(header)
+            if raw_token is not None:
+                token = _authentication.get_validated_token(raw_token)
+                user_id = token.get(api_settings.USER_ID_CLAIM)
+        except (AuthenticationFailed, InvalidToken):
+            user_id = None
+
+    request._token_user_id = user_id
+    return user_id
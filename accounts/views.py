@@ -4,10 +4,13 @@ from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
 from django.contrib.auth import authenticate
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
+from .revocation import REVOKED_TOKENS
 from .serializers import UserSerializer
+from .tokens import RevocableRefreshToken
 
 
 @swagger_auto_schema(
@@ -23,6 +26,11 @@ from .serializers import UserSerializer
             "email": openapi.Schema(type=openapi.TYPE_STRING, format=openapi.FORMAT_EMAIL, description="User email"),
             "password": openapi.Schema(type=openapi.TYPE_STRING, format=openapi.FORMAT_PASSWORD, description="User password"),
             "role": openapi.Schema(type=openapi.TYPE_STRING, description="Role of the user (Defaults to 'customer')", default="customer"),
+            "skills": openapi.Schema(
+                type=openapi.TYPE_ARRAY,
+                items=openapi.Items(type=openapi.TYPE_STRING, enum=["installation", "maintenance", "repair"]),
+                description="Service types a support staff member can work on (empty means all)",
+            ),
         }
     ),
     responses={
@@ -74,7 +82,7 @@ def login_user(request):
     user = authenticate(request, email=email, password=password)
 
     if user is not None:
-        refresh = RefreshToken.for_user(user)
+        refresh = RevocableRefreshToken.for_user(user)
         return Response(
             {"refresh": str(refresh), "access": str(refresh.access_token)}
         )
@@ -105,5 +113,43 @@ def get_user_profile(request):
     return Response(serializer.data)
 
 
+@swagger_auto_schema(
+    method="post",
+    operation_summary="Revoke JWT tokens",
+    operation_description="Revokes the access token used to authenticate this request and, if given, a refresh token "
+                          "belonging to the same user. Revoked tokens are rejected by every worker within "
+                          "TOKEN_REVOCATION_REFRESH_SECONDS.\n\n"
+                          "🔹 **Authorization Required**: Use the format `Bearer <your_token>` in the header.",
+    request_body=openapi.Schema(
+        type=openapi.TYPE_OBJECT,
+        properties={
+            "refresh": openapi.Schema(type=openapi.TYPE_STRING, description="Refresh token to revoke"),
+        },
+    ),
+    responses={
+        200: "Tokens revoked",
+        400: "Bad Request - Invalid refresh token",
+        401: "Unauthorized",
+    },
+)
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def revoke_tokens(request):
+    tokens = [request.auth]
+    raw_refresh = request.data.get("refresh")
+    if raw_refresh:
+        try:
+            refresh = RevocableRefreshToken(raw_refresh)
+        except TokenError as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        if str(refresh.get(api_settings.USER_ID_CLAIM)) != str(request.user.pk):
+            return Response({"detail": "Refresh token belongs to another user"}, status=status.HTTP_400_BAD_REQUEST)
+        tokens.append(refresh)
+
+    for token in tokens:
+        REVOKED_TOKENS.revoke(token)
+    return Response({"detail": "Tokens revoked"})
+
+
 def ping_pong(request):
     return JsonResponse({"message": "pong"})
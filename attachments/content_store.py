@@ -0,0 +1,124 @@
+import hashlib
+import mimetypes
+import os
+import tempfile
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.core.files import File
+from django.db import transaction
+
+from .models import ArchivedAttachment, Attachment
+from .upload_handlers import sniff_content_type
+
+_file_field = Attachment._meta.get_field("file")
+
+# Content release_file keeps in memory, rather than on disk, while deleting.
+RELEASE_SPOOL_BYTES = 8 * 1024 * 1024
+
+# Names store_file saved inside release_on_error(), to delete on rollback.
+_stored_names = ContextVar("stored_names", default=None)
+
+
+def content_name(sha256, content_type):
+    """Storage name for content with the given digest, sharded by its first byte."""
+    extension = mimetypes.guess_extension(content_type) or ""
+    return f"{_file_field.upload_to}{sha256[:2]}/{sha256}{extension}"
+
+
+def store_file(file):
+    """
+    Stores an uploaded file under its SHA-256 unless identical content is
+    already stored, and returns the Attachment field values describing it.
+
+    Meant to be called in the transaction creating the attachment: should a
+    concurrent release_file delete the content before that commits, it is
+    stored again on commit.
+    """
+    from service_requests.sharding import current_shard
+
+    digest = hashlib.sha256()
+    head = b""
+    for chunk in file.chunks():
+        if not head:
+            head = chunk[:64]
+        digest.update(chunk)
+    sha256 = digest.hexdigest()
+    content_type = (
+        sniff_content_type(head) or getattr(file, "content_type", None) or "application/octet-stream"
+    )
+
+    storage = _file_field.storage
+    name = content_name(sha256, content_type)
+    if not storage.exists(name):
+        _save(name, file)
+        stored = _stored_names.get()
+        if stored is not None:
+            stored.append(name)
+    transaction.on_commit(lambda: _restore(name, file), using=current_shard())
+    return {
+        "file": name,
+        "original_name": os.path.basename(file.name or ""),
+        "sha256": sha256,
+        "size": file.size,
+        "content_type": content_type,
+    }
+
+
+@contextmanager
+def release_on_error():
+    """
+    Releases the files store_file saves in the block if it raises, leaving
+    none behind for attachments whose transaction is rolled back. Wrap the
+    transaction.atomic() block, so references are checked after the rollback.
+    """
+    names = []
+    token = _stored_names.set(names)
+    try:
+        yield
+    except BaseException:
+        for name in names:
+            release_file(name)
+        raise
+    finally:
+        _stored_names.reset(token)
+
+
+def release_file(name):
+    """Deletes a stored file once no current or archived attachment on any shard refers to it."""
+    storage = _file_field.storage
+    if _is_referenced(name):
+        return
+    # An upload of the same content may have found the file still there and
+    # commit its attachment before the delete, so references are checked
+    # again afterwards and the content put back from a copy if needed.
+    with tempfile.SpooledTemporaryFile(max_size=RELEASE_SPOOL_BYTES) as copy:
+        try:
+            with storage.open(name) as stored:
+                for chunk in stored.chunks():
+                    copy.write(chunk)
+        except FileNotFoundError:
+            return
+        storage.delete(name)
+        if _is_referenced(name):
+            _save(name, File(copy, name))
+
+
+def _is_referenced(name):
+    from service_requests.sharding import fan_out
+
+    return any(fan_out(Attachment.objects.filter(file=name).exists)) or (
+        ArchivedAttachment.objects.filter(file=name).exists()
+    )
+
+
+def _save(name, content):
+    saved = _file_field.storage.save(name, content)
+    # A concurrent upload of the same content got there first.
+    if saved != name:
+        _file_field.storage.delete(saved)
+
+
+def _restore(name, file):
+    if not _file_field.storage.exists(name):
+        _save(name, file)
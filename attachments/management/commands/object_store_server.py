@@ -0,0 +1,110 @@
+import hmac
+import os
+import tempfile
+import time
+from datetime import datetime, timezone as dt_timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from attachments.storage import ALGORITHM, signature_v4
+
+PRESIGNED_PARAMETERS = ("X-Amz-Credential", "X-Amz-Date", "X-Amz-Expires", "X-Amz-Signature")
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs a local stand-in for an S3-compatible object store, keeping objects in a directory and checking "
+        "Signature Version 4 on every request, signed headers and presigned URLs alike. Start it, then run the "
+        "app with ATTACHMENT_STORAGE=object."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--port", type=int, default=9000)
+        parser.add_argument("--root", help="Directory holding the objects (defaults to a new temporary one).")
+
+    def handle(self, *args, **options):
+        command = self
+        root = options["root"] or tempfile.mkdtemp(prefix="object-store-")
+        config = settings.ATTACHMENT_STORAGE_BACKENDS["object"]["OPTIONS"]
+
+        def authorized(method, path, params, headers):
+            if "X-Amz-Signature" in params:
+                if not all(name in params for name in PRESIGNED_PARAMETERS):
+                    return False
+                amz_date = params["X-Amz-Date"]
+                issued = datetime.strptime(amz_date, "%Y%m%dT%H%M%SZ").replace(tzinfo=dt_timezone.utc)
+                if issued.timestamp() + int(params["X-Amz-Expires"]) < time.time():
+                    return False
+                signed = {name: headers.get(name, "") for name in params.get("X-Amz-SignedHeaders", "host").split(";")}
+                unsigned = {name: value for name, value in params.items() if name != "X-Amz-Signature"}
+                signature, payload_hash = params["X-Amz-Signature"], "UNSIGNED-PAYLOAD"
+            else:
+                authorization = headers.get("authorization", "")
+                if not authorization.startswith(ALGORITHM + " "):
+                    return False
+                fields = dict(part.strip().split("=", 1) for part in authorization[len(ALGORITHM):].split(","))
+                amz_date = headers.get("x-amz-date", "")
+                signed = {name: headers.get(name, "") for name in fields.get("SignedHeaders", "").split(";")}
+                unsigned, signature = params, fields.get("Signature", "")
+                payload_hash = headers.get("x-amz-content-sha256", "")
+            _, expected = signature_v4(
+                config["secret_key"], config["region"], amz_date, method, path, unsigned, signed, payload_hash
+            )
+            return hmac.compare_digest(expected, signature)
+
+        class Handler(BaseHTTPRequestHandler):
+            def _handle(self):
+                url = urlsplit(self.path)
+                path = unquote(url.path)
+                params = dict(parse_qsl(url.query, keep_blank_values=True))
+                headers = {name.lower(): value for name, value in self.headers.items()}
+                if not authorized(self.command, path, params, headers):
+                    command.stderr.write(f"Rejected {self.command} {path}: bad or expired signature.")
+                    return self._reply(403)
+
+                file_path = os.path.join(root, path.lstrip("/"))
+                if os.path.relpath(file_path, root).startswith(".."):
+                    return self._reply(400)
+                if self.command == "PUT":
+                    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+                    with open(file_path, "wb") as file:
+                        file.write(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                    return self._reply(200)
+                if self.command == "DELETE":
+                    if os.path.exists(file_path):
+                        os.remove(file_path)
+                    return self._reply(204)
+                if not os.path.isfile(file_path):
+                    return self._reply(404)
+
+                self.send_response(200)
+                self.send_header("Content-Length", str(os.path.getsize(file_path)))
+                self.send_header("Content-Type", params.get("response-content-type", "application/octet-stream"))
+                if "response-content-disposition" in params:
+                    self.send_header("Content-Disposition", params["response-content-disposition"])
+                self.end_headers()
+                if self.command == "GET":
+                    with open(file_path, "rb") as file:
+                        self.wfile.write(file.read())
+
+            def _reply(self, code):
+                self.send_response(code)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            do_GET = do_HEAD = do_PUT = do_DELETE = _handle
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", options["port"]), Handler)
+        self.stdout.write(f"Serving bucket objects from {root} on http://127.0.0.1:{options['port']}/")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
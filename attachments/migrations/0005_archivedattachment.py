@@ -0,0 +1,24 @@
+# Generated by Django 5.1.6 on 2026-10-19 14:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attachments', '0004_alter_attachment_file_and_more'),
+        ('service_requests', '0006_archivedservicerequest'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedAttachment',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('file', models.FileField(upload_to='attachments/uploads/')),
+                ('uploaded_at', models.DateTimeField()),
+                ('service_request', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attachments', to='service_requests.archivedservicerequest')),
+            ],
+        ),
+    ]
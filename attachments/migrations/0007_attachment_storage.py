@@ -0,0 +1,24 @@
+# Generated by Django 5.1.6 on 2026-10-19 15:09
+
+import attachments.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attachments', '0006_attachment_content_metadata'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='archivedattachment',
+            name='file',
+            field=models.FileField(db_index=True, storage=attachments.storage.attachment_storage, upload_to='attachments/uploads/'),
+        ),
+        migrations.AlterField(
+            model_name='attachment',
+            name='file',
+            field=models.FileField(db_index=True, storage=attachments.storage.attachment_storage, upload_to='attachments/uploads/'),
+        ),
+    ]
@@ -1,20 +1,56 @@
-import os
-from django.db import models
+from django.db import models, transaction
+
+from .storage import attachment_storage
+
 
 class Attachment(models.Model):
-    file = models.FileField(upload_to="attachments/uploads/")
+    # Uploads are stored once per distinct content under their SHA-256 (see
+    # attachments.content_store), so several rows may point at the same file.
+    file = models.FileField(upload_to="attachments/uploads/", storage=attachment_storage, db_index=True)
     service_request = models.ForeignKey(
         'service_requests.ServiceRequest',
         on_delete=models.CASCADE,
         related_name="attachments",
     )
     uploaded_at = models.DateTimeField(auto_now_add=True)
+    original_name = models.CharField(max_length=255, blank=True)
+    sha256 = models.CharField(max_length=64, blank=True)
+    size = models.PositiveBigIntegerField(null=True, blank=True)
+    content_type = models.CharField(max_length=100, blank=True)
 
     def __str__(self):
         return f"Attachment {self.id} - {self.file.name}"
 
+    def save(self, *args, **kwargs):
+        from service_requests.sharding import assign_id
+
+        assign_id(self)
+        super().save(*args, **kwargs)
+
     def delete(self, *args, **kwargs):
-        if self.file:
-            if os.path.isfile(self.file.path):
-                os.remove(self.file.path)
-        super().delete(*args, **kwargs)
+        from .content_store import release_file
+
+        name = self.file.name
+        using = self._state.db
+        result = super().delete(*args, **kwargs)
+        if name:
+            transaction.on_commit(lambda: release_file(name), using=using)
+        return result
+
+
+class ArchivedAttachment(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    file = models.FileField(upload_to="attachments/uploads/", storage=attachment_storage, db_index=True)
+    service_request = models.ForeignKey(
+        'service_requests.ArchivedServiceRequest',
+        on_delete=models.CASCADE,
+        related_name="attachments",
+    )
+    uploaded_at = models.DateTimeField()
+    original_name = models.CharField(max_length=255, blank=True)
+    sha256 = models.CharField(max_length=64, blank=True)
+    size = models.PositiveBigIntegerField(null=True, blank=True)
+    content_type = models.CharField(max_length=100, blank=True)
+
+    def __str__(self):
+        return f"Archived attachment {self.id} - {self.file.name}"
@@ -0,0 +1,57 @@
+import hashlib
+import hmac
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.urls import reverse
+
+from .storage import attachment_storage
+
+
+def _signature(name, expires, filename, content_type):
+    secret = settings.SIGNED_DOWNLOADS["SECRET"] or settings.SECRET_KEY
+    message = "\n".join((name, str(expires), filename, content_type))
+    return hmac.new(secret.encode(), message.encode(), hashlib.sha256).hexdigest()
+
+
+def signed_path(name, filename, content_type, expires):
+    """Path of serve_signed_file for name, carrying everything it needs to check and serve the file."""
+    query = urlencode({
+        "expires": expires,
+        "filename": filename,
+        "type": content_type,
+        "signature": _signature(name, expires, filename, content_type),
+    })
+    return f"{reverse('signed_file', args=[name])}?{query}"
+
+
+def verify(name, params):
+    """True if params are an unexpired signature of name, checked without any database access."""
+    try:
+        expires = int(params["expires"])
+        expected = _signature(name, expires, params["filename"], params["type"])
+    except (KeyError, ValueError):
+        return False
+    return expires >= time.time() and hmac.compare_digest(expected, params.get("signature", ""))
+
+
+def download_url(name, filename, content_type, request=None):
+    """
+    Returns an expiring URL for a stored file and its expiry as a Unix time.
+
+    Storages that can presign their own URLs, such as ObjectStorage, are sent
+    to directly. Otherwise the URL points at serve_signed_file under
+    SIGNED_DOWNLOADS["BASE_URL"] (a CDN in front of this app), or this host
+    when that is empty.
+    """
+    config = settings.SIGNED_DOWNLOADS
+    expires = int(time.time()) + config["EXPIRES_SECONDS"]
+    storage = attachment_storage()
+    if hasattr(storage, "presigned_url"):
+        return storage.presigned_url(name, config["EXPIRES_SECONDS"], filename, content_type), expires
+
+    path = signed_path(name, filename, content_type, expires)
+    if config["BASE_URL"]:
+        return config["BASE_URL"].rstrip("/") + path, expires
+    return (request.build_absolute_uri(path) if request else path), expires
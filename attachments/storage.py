@@ -0,0 +1,165 @@
+import hashlib
+import hmac
+import urllib.error
+import urllib.request
+from datetime import datetime, timezone as dt_timezone
+from urllib.parse import quote, urlsplit
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import Storage, storages
+from django.utils.deconstruct import deconstructible
+
+ALGORITHM = "AWS4-HMAC-SHA256"
+UNSIGNED_PAYLOAD = "UNSIGNED-PAYLOAD"
+
+
+def attachment_storage():
+    """
+    The storage configured as STORAGES["attachments"]. Attachment fields take
+    this callable so migrations do not depend on the configured backend.
+    """
+    return storages["attachments"]
+
+
+def _quote(value, safe="-_.~"):
+    return quote(str(value), safe=safe)
+
+
+def canonical_query(params):
+    return "&".join(f"{_quote(key)}={_quote(value)}" for key, value in sorted(params.items()))
+
+
+def signature_v4(secret_key, region, amz_date, method, path, params, headers, payload_hash):
+    """
+    AWS Signature Version 4 for an S3 request. headers maps lower-case names
+    to values and must include host; returns the signed header list and the
+    signature. Used both to sign requests and, by object_store_server, to
+    check them.
+    """
+    signed_headers = ";".join(sorted(headers))
+    canonical_request = "\n".join((
+        method,
+        _quote(path, safe="-_.~/"),
+        canonical_query(params),
+        "".join(f"{name}:{headers[name].strip()}\n" for name in sorted(headers)),
+        signed_headers,
+        payload_hash,
+    ))
+    scope = f"{amz_date[:8]}/{region}/s3/aws4_request"
+    string_to_sign = "\n".join((
+        ALGORITHM, amz_date, scope, hashlib.sha256(canonical_request.encode()).hexdigest(),
+    ))
+    key = f"AWS4{secret_key}".encode()
+    for part in (amz_date[:8], region, "s3", "aws4_request"):
+        key = hmac.new(key, part.encode(), hashlib.sha256).digest()
+    return signed_headers, hmac.new(key, string_to_sign.encode(), hashlib.sha256).hexdigest()
+
+
+@deconstructible
+class ObjectStorage(Storage):
+    """
+    Files in a bucket of an S3-compatible object store, addressed path-style
+    as endpoint_url/bucket/name and authenticated with Signature Version 4.
+    Only what attachments need is implemented. presigned_url() hands out
+    expiring links that the object store or a CDN in front of it serves.
+    """
+
+    def __init__(self, endpoint_url, bucket, access_key, secret_key, region="us-east-1", timeout=10):
+        self.endpoint_url = endpoint_url.rstrip("/")
+        self.endpoint = urlsplit(self.endpoint_url)
+        self.bucket = bucket
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.region = region
+        self.timeout = timeout
+
+    def _path(self, name):
+        return f"{self.endpoint.path}/{self.bucket}/{name}"
+
+    def _url(self, name, params=None):
+        url = f"{self.endpoint.scheme}://{self.endpoint.netloc}{_quote(self._path(name), safe='-_.~/')}"
+        return f"{url}?{canonical_query(params)}" if params else url
+
+    def _request(self, method, name, data=None, headers=None):
+        amz_date = datetime.now(dt_timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        signed = {
+            "host": self.endpoint.netloc,
+            "x-amz-content-sha256": UNSIGNED_PAYLOAD,
+            "x-amz-date": amz_date,
+        }
+        signed_headers, signature = signature_v4(
+            self.secret_key, self.region, amz_date, method, self._path(name), {}, signed, UNSIGNED_PAYLOAD
+        )
+        credential = f"{self.access_key}/{amz_date[:8]}/{self.region}/s3/aws4_request"
+        request = urllib.request.Request(
+            self._url(name),
+            data=data,
+            method=method,
+            headers={
+                **(headers or {}),
+                "X-Amz-Content-SHA256": UNSIGNED_PAYLOAD,
+                "X-Amz-Date": amz_date,
+                "Authorization": f"{ALGORITHM} Credential={credential}, SignedHeaders={signed_headers}, "
+                                 f"Signature={signature}",
+            },
+        )
+        try:
+            return urllib.request.urlopen(request, timeout=self.timeout)
+        except urllib.error.HTTPError as exc:
+            if exc.code == 404:
+                raise FileNotFoundError(name) from exc
+            raise
+
+    def _open(self, name, mode="rb"):
+        response = self._request("GET", name)
+        file = File(response, name)
+        file.size = int(response.headers.get("Content-Length", 0))
+        return file
+
+    def _save(self, name, content):
+        content.seek(0)
+        headers = {"Content-Length": str(content.size), "Content-Type": "application/octet-stream"}
+        self._request("PUT", name, data=content.chunks(), headers=headers).close()
+        return name
+
+    def delete(self, name):
+        try:
+            self._request("DELETE", name).close()
+        except FileNotFoundError:
+            pass
+
+    def exists(self, name):
+        try:
+            self._request("HEAD", name).close()
+        except FileNotFoundError:
+            return False
+        return True
+
+    def size(self, name):
+        with self._request("HEAD", name) as response:
+            return int(response.headers["Content-Length"])
+
+    def url(self, name):
+        # Serialized attachment URLs expire like the app's own signed links.
+        return self.presigned_url(name, settings.SIGNED_DOWNLOADS["EXPIRES_SECONDS"])
+
+    def presigned_url(self, name, expires_in, filename=None, content_type=None):
+        """GET URL valid for expires_in seconds, optionally overriding the download name and type."""
+        amz_date = datetime.now(dt_timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        params = {
+            "X-Amz-Algorithm": ALGORITHM,
+            "X-Amz-Credential": f"{self.access_key}/{amz_date[:8]}/{self.region}/s3/aws4_request",
+            "X-Amz-Date": amz_date,
+            "X-Amz-Expires": str(expires_in),
+            "X-Amz-SignedHeaders": "host",
+        }
+        if filename:
+            params["response-content-disposition"] = f"attachment; filename*=UTF-8''{_quote(filename)}"
+        if content_type:
+            params["response-content-type"] = content_type
+        _, signature = signature_v4(
+            self.secret_key, self.region, amz_date, "GET", self._path(name), params,
+            {"host": self.endpoint.netloc}, UNSIGNED_PAYLOAD,
+        )
+        return self._url(name, {**params, "X-Amz-Signature": signature})
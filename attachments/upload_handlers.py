@@ -0,0 +1,92 @@
+from django.conf import settings
+from django.core.files.uploadhandler import FileUploadHandler
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+# Leading bytes of the attachment types we accept, checked against the
+# first chunk of each file instead of trusting the client's Content-Type.
+SIGNATURES = (
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+    (b"%PDF-", "application/pdf"),
+)
+HEIF_BRANDS = (b"heic", b"heix", b"mif1", b"msf1")
+
+
+def sniff_content_type(data):
+    """Returns the content type identified by the first bytes of a file, or None."""
+    for signature, content_type in SIGNATURES:
+        if data.startswith(signature):
+            return content_type
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    if data[4:8] == b"ftyp" and data[8:12] in HEIF_BRANDS:
+        return "image/heic"
+    return None
+
+
+class UploadTooLarge(APIException):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = "Upload is too large."
+    default_code = "upload_too_large"
+
+
+class UnsupportedAttachmentType(APIException):
+    status_code = status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
+    default_detail = "Unsupported attachment type."
+    default_code = "unsupported_attachment_type"
+
+
+class QuotaUploadHandler(FileUploadHandler):
+    """
+    Rejects uploads while they stream in rather than after they are stored.
+
+    Placed first in FILE_UPLOAD_HANDLERS, it sees every chunk before the
+    memory or temporary file handlers do. A request whose declared length is
+    over MAX_REQUEST_SIZE is refused before its body is read; otherwise the
+    first chunk of each file must match an allowed type, so empty files are
+    refused, and the running file and request totals must stay within the
+    limits. Raising aborts parsing, so the rest of the body is never buffered.
+    """
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        config = settings.ATTACHMENT_UPLOADS
+        self.max_file_size = config["MAX_FILE_SIZE"]
+        self.max_request_size = config["MAX_REQUEST_SIZE"]
+        self.allowed_types = frozenset(config["ALLOWED_TYPES"])
+        self.received = 0
+        self.file_size = 0
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        if content_length > self.max_request_size:
+            raise UploadTooLarge(f"Uploads are limited to {self.max_request_size} bytes per request.")
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.file_size = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        if start == 0 and sniff_content_type(raw_data) not in self.allowed_types:
+            raise self._unsupported()
+
+        self.file_size += len(raw_data)
+        self.received += len(raw_data)
+        if self.file_size > self.max_file_size:
+            raise UploadTooLarge(f"{self.file_name} is larger than {self.max_file_size} bytes.")
+        if self.received > self.max_request_size:
+            raise UploadTooLarge(f"Uploads are limited to {self.max_request_size} bytes per request.")
+        return raw_data
+
+    def file_complete(self, file_size):
+        # An empty file never reaches receive_data_chunk, so it was not sniffed.
+        if self.file_size == 0:
+            raise self._unsupported()
+        return None
+
+    def _unsupported(self):
+        return UnsupportedAttachmentType(
+            f"{self.file_name} is not one of the accepted types: {', '.join(sorted(self.allowed_types))}."
+        )
@@ -0,0 +1,7 @@
+from django.urls import path
+
+from .views import serve_signed_file
+
+urlpatterns = [
+    path("<path:name>", serve_signed_file, name="signed_file"),
+]
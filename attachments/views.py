@@ -0,0 +1,42 @@
+import os
+import re
+import time
+
+from django.http import FileResponse, Http404, HttpResponseForbidden, HttpResponseNotModified
+from django.utils.http import parse_etags
+from django.views.decorators.http import require_safe
+
+from . import signing
+from .storage import attachment_storage
+
+# Content-addressed names end in the SHA-256 of the file (see content_store).
+CONTENT_DIGEST = re.compile(r"^[0-9a-f]{64}$")
+
+
+@require_safe
+def serve_signed_file(request, name):
+    """
+    Serves a file from a URL made by signing.download_url. The URL carries
+    the name, type and expiry, so no database or token lookup is needed and
+    a CDN may cache the response until the link expires.
+    """
+    if not signing.verify(name, request.GET):
+        return HttpResponseForbidden("Invalid or expired download link.")
+
+    digest = os.path.splitext(os.path.basename(name))[0]
+    etag = f'"{digest}"' if CONTENT_DIGEST.match(digest) else None
+    cache_control = f"public, max-age={max(int(request.GET['expires']) - int(time.time()), 0)}"
+    if etag and etag in parse_etags(request.headers.get("If-None-Match", "")):
+        response = HttpResponseNotModified()
+    else:
+        try:
+            file = attachment_storage().open(name, "rb")
+        except FileNotFoundError:
+            raise Http404("File not found")
+        response = FileResponse(
+            file, as_attachment=True, filename=request.GET["filename"], content_type=request.GET["type"] or None
+        )
+    if etag:
+        response["ETag"] = etag
+    response["Cache-Control"] = cache_control
+    return response
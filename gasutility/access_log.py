@@ -0,0 +1,138 @@
+import atexit
+import json
+import os
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from .metrics import REGISTRY
+
+ACCESS_LOG_DROPPED = REGISTRY.counter(
+    "access_log_dropped_total", "Access log records dropped because the buffer was full.")
+ACCESS_LOG_WRITTEN = REGISTRY.counter(
+    "access_log_written_total", "Access log records written to disk.")
+
+
+class BufferedAccessLog:
+    """
+    Appends JSON lines to a file from a background thread.
+
+    write() only appends to an in-memory buffer, so requests never wait on disk.
+    The writer thread flushes up to batch_size records at a time, every
+    flush_interval seconds or sooner once a batch is full. When max_buffer
+    records are already waiting, new records are dropped and counted instead
+    of growing memory without bound.
+    """
+
+    def __init__(self, path, max_buffer, batch_size, flush_interval):
+        self.path = path
+        self.max_buffer = max_buffer
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._buffer = deque()
+        self._condition = threading.Condition()
+        self._pid = None
+        self._file = None
+
+    def write(self, record):
+        with self._condition:
+            if len(self._buffer) >= self.max_buffer:
+                self.dropped += 1
+                ACCESS_LOG_DROPPED.inc()
+                return
+            self._buffer.append(record)
+            if len(self._buffer) >= self.batch_size:
+                self._condition.notify()
+        if self._pid != os.getpid():
+            self._start()
+
+    def flush(self):
+        while True:
+            with self._condition:
+                batch = [self._buffer.popleft() for _ in range(min(self.batch_size, len(self._buffer)))]
+            if not batch:
+                return
+            self._write_batch(batch)
+
+    def _start(self):
+        with self._condition:
+            # Worker processes forked from a parent need their own writer thread.
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._file = None
+        threading.Thread(target=self._run, name="access-log-writer", daemon=True).start()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                if len(self._buffer) < self.batch_size:
+                    self._condition.wait(self.flush_interval)
+            self.flush()
+
+    def _write_batch(self, batch):
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8")
+        self._file.write("".join(json.dumps(record, separators=(",", ":")) + "\n" for record in batch))
+        self._file.flush()
+        ACCESS_LOG_WRITTEN.inc(len(batch))
+
+
+_logs = {}
+_logs_lock = threading.Lock()
+
+
+def shared_log(config):
+    """
+    One BufferedAccessLog per file and process, shared by every middleware
+    instance writing to it, including the one batch sub-requests run through.
+    """
+    path = str(config["PATH"])
+    with _logs_lock:
+        if path not in _logs:
+            _logs[path] = BufferedAccessLog(path, config["MAX_BUFFER"], config["BATCH_SIZE"], config["FLUSH_INTERVAL"])
+            atexit.register(_logs[path].flush)
+        return _logs[path]
+
+
+class AccessLogMiddleware:
+    """Records one structured line per request; belongs at the top of MIDDLEWARE."""
+
+    def __init__(self, get_response):
+        config = settings.ACCESS_LOG
+        if not config["PATH"]:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.log = shared_log(config)
+
+    def __call__(self, request):
+        start = time.perf_counter()
+        response = self.get_response(request)
+        latency = time.perf_counter() - start
+
+        # DRF stores the user it authenticated on the underlying request.
+        user = getattr(request, "user", None)
+        authenticated = user is not None and user.is_authenticated
+        match = getattr(request, "resolver_match", None)
+        if response.streaming:
+            size = int(response["Content-Length"]) if response.has_header("Content-Length") else None
+        else:
+            size = len(response.content)
+
+        self.log.write({
+            "time": time.time(),
+            "method": request.method,
+            "path": request.path,
+            "route": match.url_name if match else None,
+            "status": response.status_code,
+            "latency_ms": round(latency * 1000, 3),
+            "bytes": size,
+            "user_id": user.pk if authenticated else None,
+            "role": getattr(user, "role", None) if authenticated else None,
+        })
+        return response
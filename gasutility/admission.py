@@ -0,0 +1,122 @@
+import math
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+from django.conf import settings
+from django.http import JsonResponse
+
+from accounts.tokens import get_token_user_id
+
+
+class TokenBuckets:
+    """Per-key token buckets, bounded to the most recently seen keys."""
+
+    def __init__(self, rate, burst, max_keys):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key):
+        """Consumes one token for key, returning 0 or the seconds to wait for the next one."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0
+            else:
+                wait = (1 - tokens) / self.rate
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+
+class AdmissionLimits:
+    """Token buckets and in-flight counts behind one AdmissionControlMiddleware."""
+
+    def __init__(self, config):
+        self.max_in_flight = config["MAX_IN_FLIGHT"]
+        self.reserved = config["RESERVED_FOR_PRIORITY"]
+        self.priority_routes = frozenset(config["PRIORITY_ROUTES"])
+        self.route_limits = config["ROUTE_CONCURRENCY"]
+        self.buckets = TokenBuckets(config["RATE"], config["BURST"], config["MAX_TRACKED_CLIENTS"])
+
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._route_in_flight = defaultdict(int)
+
+    def acquire(self, route):
+        limit = self.max_in_flight
+        if route not in self.priority_routes:
+            limit -= self.reserved
+
+        with self._lock:
+            route_limit = self.route_limits.get(route)
+            if self._in_flight >= limit:
+                return False
+            if route_limit is not None and self._route_in_flight[route] >= route_limit:
+                return False
+            self._in_flight += 1
+            self._route_in_flight[route] += 1
+        return True
+
+    def release(self, route):
+        with self._lock:
+            self._in_flight -= 1
+            self._route_in_flight[route] -= 1
+
+
+class AdmissionControlMiddleware:
+    """
+    Sheds load before it reaches the views instead of letting requests queue.
+
+    Every routed request spends a token from its caller's bucket (429 when empty)
+    and must fit under both the per-route and the global concurrency limits (503
+    when full). Part of the global capacity is reserved for PRIORITY_ROUTES so
+    reads cannot starve service request creation. State lives in the memory of
+    each worker process and is shared by its threads; limits are per worker.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.retry_after = settings.ADMISSION_CONTROL["RETRY_AFTER"]
+        self.limits = AdmissionLimits(settings.ADMISSION_CONTROL)
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        admitted = getattr(request, "_admitted", None)
+        if admitted is not None:
+            limits, route = admitted
+            limits.release(route)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        route = request.resolver_match.url_name
+        if route is None:
+            return None
+
+        # Batch sub-requests (gasutility.batch) carry the limits that admitted
+        # their batch, so each of them is charged to the same buckets and counts.
+        limits = getattr(request, "_admission_limits", None) or self.limits
+        user_id = get_token_user_id(request)
+        client = f"user:{user_id}" if user_id is not None else f"ip:{request.META.get('REMOTE_ADDR')}"
+        wait = limits.buckets.take(client)
+        if wait:
+            return self._reject(429, "Rate limit exceeded.", math.ceil(wait))
+
+        if not limits.acquire(route):
+            return self._reject(503, "Server is busy, retry later.", self.retry_after)
+
+        request._admitted = (limits, route)
+        request._admission_limits = limits
+        return None
+
+    def _reject(self, status_code, detail, retry_after):
+        response = JsonResponse({"detail": detail}, status=status_code)
+        response["Retry-After"] = str(retry_after)
+        return response
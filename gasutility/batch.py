@@ -0,0 +1,206 @@
+import contextvars
+import functools
+import io
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode, urlsplit
+
+from django.conf import settings
+from django.core.handlers.base import BaseHandler
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import connections
+from django.urls import Resolver404, resolve
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+ALLOWED_METHODS = SAFE_METHODS | {"POST", "PUT", "PATCH", "DELETE"}
+
+# Server and client details every sub-request inherits from the batch request.
+INHERITED_HEADERS = ("HTTP_HOST", "HTTP_USER_AGENT", "HTTP_ACCEPT_LANGUAGE", "HTTP_X_FORWARDED_FOR")
+
+
+def _sub_request(request, method, path, body, headers):
+    """Builds a plain Django request for one entry of the batch."""
+    url = urlsplit(path)
+    payload = b"" if body is None else json.dumps(body).encode()
+    environ = {key: value for key, value in request.META.items() if not key.startswith("HTTP_")}
+    environ.update((key, request.META[key]) for key in INHERITED_HEADERS if key in request.META)
+    environ.update({
+        "REQUEST_METHOD": method,
+        "PATH_INFO": url.path,
+        "SCRIPT_NAME": "",
+        "QUERY_STRING": url.query,
+        "CONTENT_TYPE": "application/json",
+        "CONTENT_LENGTH": str(len(payload)),
+        "wsgi.input": io.BytesIO(payload),
+    })
+    for name, value in headers.items():
+        environ["HTTP_" + name.upper().replace("-", "_")] = str(value)
+    # Bodies are embedded in the batch response, which is compressed as a
+    # whole if at all, so sub-responses must come back uncompressed.
+    environ.pop("HTTP_ACCEPT_ENCODING", None)
+
+    sub_request = WSGIRequest(environ)
+    # The batch request is already authenticated; DRF skips its authenticators
+    # when these are set, so the token is not decoded again for every entry.
+    sub_request._force_auth_user = request.user
+    sub_request._force_auth_token = request.auth
+    sub_request._token_user_id = request.user.pk
+    # Admission control charges every sub-request to the limits that admitted
+    # the batch, so batching does not bypass rate or concurrency limits.
+    admission_limits = getattr(request._request, "_admission_limits", None)
+    if admission_limits is not None:
+        sub_request._admission_limits = admission_limits
+    return sub_request
+
+
+@functools.cache
+def _handler():
+    """
+    Handler running sub-requests through the full middleware stack, so each
+    one is admitted, rate limited, timed and logged like a request of its own.
+    """
+    handler = BaseHandler()
+    handler.load_middleware()
+    return handler
+
+
+def _bad_request(detail):
+    return {"status": status.HTTP_400_BAD_REQUEST, "body": {"detail": detail}}
+
+
+def _dispatch(request, entry):
+    method = str(entry.get("method", "GET")).upper()
+    path = entry.get("path")
+    if method not in ALLOWED_METHODS or not isinstance(path, str) or not path.startswith("/"):
+        return _bad_request("Each request needs a method and an absolute path.")
+    query = entry.get("query")
+    if query is not None and not isinstance(query, dict):
+        return _bad_request("query must be an object.")
+    headers = entry.get("headers")
+    if headers is not None and not isinstance(headers, dict):
+        return _bad_request("headers must be an object.")
+
+    if query:
+        path = f"{path}{'&' if '?' in path else '?'}{urlencode(query, doseq=True)}"
+    sub_request = _sub_request(request, method, path, entry.get("body"), headers or {})
+    try:
+        match = resolve(sub_request.path_info)
+    except Resolver404:
+        return {"status": status.HTTP_404_NOT_FOUND, "body": {"detail": "Not found."}}
+    if match.func is batch_requests:
+        return _bad_request("Batches cannot be nested.")
+
+    # The handler turns exceptions raised by views, such as Http404 from
+    # plain Django views, into responses; anything escaping it only fails
+    # this entry.
+    try:
+        response = _handler().get_response(sub_request)
+        if response.streaming:
+            response.close()
+            return {"status": status.HTTP_400_BAD_REQUEST, "body": {"detail": "Streaming responses cannot be batched."}}
+        body = _body(response)
+    except Exception:
+        logger.exception("Batched %s %s failed", method, path)
+        return {"status": status.HTTP_500_INTERNAL_SERVER_ERROR, "body": {"detail": "Internal server error."}}
+    result = {"status": response.status_code}
+    if "ETag" in response:
+        result["etag"] = response["ETag"]
+    if body is not None:
+        result["body"] = body
+    return result
+
+
+def _body(response):
+    """
+    The response body as JSON data where possible, so errors returned by
+    middleware (e.g. a 429 from admission control) read like those of views.
+    """
+    if hasattr(response, "data"):
+        return response.data
+    if not response.content:
+        return None
+    content = response.content.decode(response.charset)
+    if response.get("Content-Type", "").split(";")[0].strip() == "application/json":
+        return json.loads(content)
+    return content
+
+
+def _dispatch_in_thread(context, request, entry):
+    try:
+        return context.run(_dispatch, request, entry)
+    finally:
+        connections.close_all()
+
+
+@swagger_auto_schema(
+    method="post",
+    operation_summary="Run several API requests at once",
+    operation_description="Authenticates once and runs each sub-request through the URL resolver, returning the status, "
+                          "ETag and body of every response in order. Sub-requests send JSON bodies; file uploads and "
+                          "downloads cannot be batched. Every sub-request counts against the rate and concurrency limits. "
+                          "With `parallel` set and only read requests in the batch, they "
+                          "run concurrently.\n\n"
+                          "🔹 **Authorization Required**: Use the format `Bearer <your_token>` in the header.",
+    request_body=openapi.Schema(
+        type=openapi.TYPE_OBJECT,
+        required=["requests"],
+        properties={
+            "requests": openapi.Schema(
+                type=openapi.TYPE_ARRAY,
+                items=openapi.Schema(
+                    type=openapi.TYPE_OBJECT,
+                    required=["path"],
+                    properties={
+                        "method": openapi.Schema(type=openapi.TYPE_STRING, default="GET"),
+                        "path": openapi.Schema(type=openapi.TYPE_STRING, description="e.g. /api/profile/"),
+                        "query": openapi.Schema(type=openapi.TYPE_OBJECT, description="Query string parameters"),
+                        "headers": openapi.Schema(type=openapi.TYPE_OBJECT, description="e.g. If-Match"),
+                        "body": openapi.Schema(type=openapi.TYPE_OBJECT, description="JSON request body"),
+                    },
+                ),
+            ),
+            "parallel": openapi.Schema(type=openapi.TYPE_BOOLEAN, default=False),
+        },
+    ),
+    responses={
+        200: "One result per sub-request with its status, etag and body",
+        400: "Invalid or too many sub-requests",
+    },
+)
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def batch_requests(request):
+    config = settings.BATCH_REQUESTS
+    if not isinstance(request.data, dict):
+        return Response({"detail": "The body must be an object."}, status=status.HTTP_400_BAD_REQUEST)
+    entries = request.data.get("requests")
+    if not isinstance(entries, list) or not entries or not all(isinstance(entry, dict) for entry in entries):
+        return Response({"detail": "requests must be a non-empty list of objects."}, status=status.HTTP_400_BAD_REQUEST)
+    if len(entries) > config["MAX_REQUESTS"]:
+        return Response(
+            {"detail": f"At most {config['MAX_REQUESTS']} requests can be batched."},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    reads_only = all(str(entry.get("method", "GET")).upper() in SAFE_METHODS for entry in entries)
+    if request.data.get("parallel") and reads_only and len(entries) > 1:
+        # Each worker thread runs in a copy of this context so database routing
+        # decisions made by middleware still apply, and closes its connections.
+        with ThreadPoolExecutor(max_workers=min(config["MAX_WORKERS"], len(entries))) as executor:
+            futures = [
+                executor.submit(_dispatch_in_thread, contextvars.copy_context(), request, entry)
+                for entry in entries
+            ]
+            results = [future.result() for future in futures]
+    else:
+        results = [_dispatch(request, entry) for entry in entries]
+    return Response({"responses": results})
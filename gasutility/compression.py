@@ -0,0 +1,171 @@
+import zlib
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Content types whose payloads are already compressed, e.g. attachment downloads.
+INCOMPRESSIBLE_PREFIXES = ("image/", "video/", "audio/")
+INCOMPRESSIBLE_TYPES = frozenset((
+    "application/pdf",
+    "application/zip",
+    "application/gzip",
+    "application/x-gzip",
+    "application/x-7z-compressed",
+    "application/zstd",
+    "application/octet-stream",
+))
+
+
+class GzipCodec:
+    name = "gzip"
+
+    def __init__(self, level):
+        self.level = level
+
+    def compressor(self):
+        # wbits=31 writes the gzip container rather than a raw zlib stream.
+        compressobj = zlib.compressobj(self.level, zlib.DEFLATED, 31)
+        return compressobj.compress, compressobj.flush
+
+
+class ZstdCodec:
+    name = "zstd"
+
+    def __init__(self, level):
+        self._compressor = zstandard.ZstdCompressor(level=level)
+
+    def compressor(self):
+        compressobj = self._compressor.compressobj()
+        return compressobj.compress, compressobj.flush
+
+
+class BrotliCodec:
+    name = "br"
+
+    def __init__(self, quality):
+        self.quality = quality
+
+    def compressor(self):
+        compressobj = brotli.Compressor(quality=self.quality)
+        return compressobj.process, compressobj.finish
+
+
+def available_codecs():
+    """Returns the codecs usable in this environment, most preferred first."""
+    config = settings.COMPRESSION
+    codecs = []
+    if zstandard is not None:
+        codecs.append(ZstdCodec(config["ZSTD_LEVEL"]))
+    if brotli is not None:
+        codecs.append(BrotliCodec(config["BROTLI_QUALITY"]))
+    codecs.append(GzipCodec(config["GZIP_LEVEL"]))
+    return codecs
+
+
+def compress(codec, data):
+    compress_chunk, flush = codec.compressor()
+    return compress_chunk(data) + flush()
+
+
+def compress_stream(codec, chunks):
+    compress_chunk, flush = codec.compressor()
+    for chunk in chunks:
+        compressed = compress_chunk(chunk)
+        if compressed:
+            yield compressed
+    yield flush()
+
+
+def parse_accept_encoding(header):
+    """Maps each encoding in an Accept-Encoding header to its q-value."""
+    accepted = {}
+    for item in header.split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name] = quality
+    return accepted
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Compresses responses with the best codec the client accepts: zstd or brotli
+    when their packages are installed, gzip otherwise. Bodies smaller than
+    COMPRESSION["MIN_SIZE"] and already-compressed content types are sent as is.
+    Streaming responses are compressed chunk by chunk as they are sent.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.codecs = available_codecs()
+        self.min_size = settings.COMPRESSION["MIN_SIZE"]
+
+    def process_response(self, request, response):
+        if response.has_header("Content-Encoding") or response.status_code in (204, 304):
+            return response
+        if self._is_incompressible(response):
+            return response
+        if response.streaming:
+            if response.is_async:
+                return response
+            content_length = response.get("Content-Length")
+            if content_length and int(content_length) < self.min_size:
+                return response
+        elif len(response.content) < self.min_size:
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        codec = self._negotiate(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        if codec is None:
+            return response
+
+        if response.streaming:
+            response.streaming_content = compress_stream(codec, response.streaming_content)
+            del response.headers["Content-Length"]
+        else:
+            compressed_content = compress(codec, response.content)
+            if len(compressed_content) >= len(response.content):
+                return response
+            response.content = compressed_content
+            response.headers["Content-Length"] = str(len(compressed_content))
+
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = codec.name
+        return response
+
+    def _negotiate(self, header):
+        if not header:
+            return None
+        accepted = parse_accept_encoding(header)
+        wildcard = accepted.get("*", 0.0)
+        best, best_quality = None, 0.0
+        for codec in self.codecs:
+            quality = accepted.get(codec.name, wildcard)
+            if quality > best_quality:
+                best, best_quality = codec, quality
+        return best
+
+    def _is_incompressible(self, response):
+        content_type = response.get("Content-Type", "").split(";", 1)[0].strip().lower()
+        return content_type.startswith(INCOMPRESSIBLE_PREFIXES) or content_type in INCOMPRESSIBLE_TYPES
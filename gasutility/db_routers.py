@@ -0,0 +1,78 @@
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import MiddlewareNotUsed
+
+from accounts.tokens import get_token_user_id
+
+REPLICA_PREFIX = "replica_"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+# Reads only go to replicas inside requests that opted in; management commands,
+# shells and write requests always read from the primary.
+_read_from_replica = ContextVar("read_from_replica", default=False)
+
+
+def replica_aliases():
+    return [alias for alias in settings.DATABASES if alias.startswith(REPLICA_PREFIX)]
+
+
+def _pin_key(user_id):
+    return f"replica-pin:{user_id}"
+
+
+class PrimaryReplicaRouter:
+    """Sends writes to the primary and, where allowed, reads to a random replica."""
+
+    def __init__(self):
+        self.replicas = replica_aliases()
+
+    def db_for_read(self, model, **hints):
+        if self.replicas and _read_from_replica.get():
+            return random.choice(self.replicas)
+        return "default"
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in self.replicas:
+            return False
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Lets safe requests read from replicas, except for users who wrote recently.
+
+    A successful write pins its user to the primary for REPLICA_PIN_SECONDS so
+    they read their own writes while the replicas catch up. Pins live in the
+    REPLICA_PIN_CACHE cache, which must be shared between workers in production.
+    """
+
+    def __init__(self, get_response):
+        if not replica_aliases():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.cache = caches[settings.REPLICA_PIN_CACHE]
+        self.pin_seconds = settings.REPLICA_PIN_SECONDS
+
+    def __call__(self, request):
+        user_id = get_token_user_id(request)
+        safe = request.method in SAFE_METHODS
+        pinned = user_id is not None and self.cache.get(_pin_key(user_id), False)
+
+        token = _read_from_replica.set(safe and not pinned)
+        try:
+            response = self.get_response(request)
+        finally:
+            _read_from_replica.reset(token)
+
+        if not safe and user_id is not None and response.status_code < 400:
+            self.cache.set(_pin_key(user_id), True, self.pin_seconds)
+        return response
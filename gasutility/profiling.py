@@ -0,0 +1,76 @@
+import cProfile
+import os
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import MiddlewareNotUsed
+
+PROFILE_HEADER = "X-Profile"
+SIGNING_SALT = "gasutility.profiling"
+
+
+def issue_token():
+    """Returns a value for the X-Profile header that forces profiling of a request."""
+    return signing.TimestampSigner(salt=SIGNING_SALT).sign("profile")
+
+
+def view_name(view_func):
+    # DRF's @api_view wraps functions in a class named after the function.
+    return getattr(view_func, "cls", view_func).__name__
+
+
+class ProfilingMiddleware:
+    """
+    Runs selected requests under cProfile and stores the stats in
+    PROFILING["DIR"]/<view name>/ for the profile_report command.
+
+    A request is profiled when it carries a valid X-Profile token (see
+    issue_token) or is picked by PROFILING["SAMPLE_RATE"]. Must be the last
+    middleware so the other middlewares' process_view hooks still run.
+    """
+
+    def __init__(self, get_response):
+        config = settings.PROFILING
+        if not config["ENABLED"]:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.directory = config["DIR"]
+        self.sample_rate = config["SAMPLE_RATE"]
+        self.token_max_age = config["TOKEN_MAX_AGE"]
+        self.signer = signing.TimestampSigner(salt=SIGNING_SALT)
+        self._counter = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not self._should_profile(request):
+            return None
+
+        profiler = cProfile.Profile()
+        try:
+            return profiler.runcall(view_func, request, *view_args, **view_kwargs)
+        finally:
+            self._store(profiler, view_name(view_func))
+
+    def _should_profile(self, request):
+        token = request.headers.get(PROFILE_HEADER)
+        if token:
+            try:
+                self.signer.unsign(token, max_age=self.token_max_age)
+                return True
+            except signing.BadSignature:
+                pass
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def _store(self, profiler, name):
+        with self._lock:
+            self._counter += 1
+            counter = self._counter
+        directory = os.path.join(self.directory, name)
+        os.makedirs(directory, exist_ok=True)
+        profiler.dump_stats(os.path.join(directory, f"{time.time():.6f}-{os.getpid()}-{counter}.prof"))
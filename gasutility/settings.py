@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -51,18 +52,95 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 10,
 }
 
+SIMPLE_JWT = {
+    "AUTH_TOKEN_CLASSES": ("accounts.tokens.RevocableAccessToken",),
+    "TOKEN_REFRESH_SERIALIZER": "accounts.serializers.RevocableTokenRefreshSerializer",
+}
+
 
 
 MIDDLEWARE = [
+    'gasutility.access_log.AccessLogMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'gasutility.metrics.MetricsMiddleware',
+    'gasutility.compression.CompressionMiddleware',
+    'gasutility.db_routers.ReplicaRoutingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
+    'gasutility.admission.AdmissionControlMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'gasutility.profiling.ProfilingMiddleware',
 ]
 
+# Load shedding applied by gasutility.admission.AdmissionControlMiddleware.
+# Limits apply per worker process. RATE and BURST define each caller's token
+# bucket (requests per second and bucket size); RESERVED_FOR_PRIORITY slots of
+# MAX_IN_FLIGHT are only usable by PRIORITY_ROUTES.
+ADMISSION_CONTROL = {
+    "MAX_IN_FLIGHT": 64,
+    "RESERVED_FOR_PRIORITY": 16,
+    "PRIORITY_ROUTES": ["create_service_request"],
+    "ROUTE_CONCURRENCY": {
+        "create_service_request": 32,
+        "get_all_service_request_by_staff": 24,
+        "sync_service_requests": 16,
+        "download_file": 16,
+    },
+    "RATE": 5.0,
+    "BURST": 20,
+    "MAX_TRACKED_CLIENTS": 100_000,
+    "RETRY_AFTER": 1,
+}
+
+# Response compression applied by gasutility.compression.CompressionMiddleware.
+# zstd and brotli are used when the zstandard / brotli packages are installed.
+COMPRESSION = {
+    "MIN_SIZE": 1024,
+    "GZIP_LEVEL": 6,
+    "ZSTD_LEVEL": 3,
+    "BROTLI_QUALITY": 4,
+}
+
+# On-demand profiling by gasutility.profiling.ProfilingMiddleware. Requests are
+# profiled when sampled or when they carry an X-Profile token printed by
+# `manage.py profile_report --issue-token`; `manage.py profile_report` summarises
+# the stored profiles.
+PROFILING = {
+    "ENABLED": True,
+    "SAMPLE_RATE": 0.0,
+    "TOKEN_MAX_AGE": 3600,
+    "DIR": BASE_DIR / "profiles",
+}
+
+# Metrics exposed on /metrics by gasutility.metrics. With several worker
+# processes set DIR to a directory shared by them; each worker writes a
+# snapshot there at most every FLUSH_INTERVAL seconds and /metrics sums them.
+METRICS = {
+    "DIR": os.environ.get("METRICS_DIR"),
+    "FLUSH_INTERVAL": 5,
+}
+
+# Structured access log written by gasutility.access_log.AccessLogMiddleware
+# as JSON lines from a background thread. At most MAX_BUFFER records wait in
+# memory; records beyond that are dropped and counted in /metrics.
+ACCESS_LOG = {
+    "PATH": os.environ.get("ACCESS_LOG_PATH", BASE_DIR / "logs" / "access.log"),
+    "MAX_BUFFER": 10_000,
+    "BATCH_SIZE": 500,
+    "FLUSH_INTERVAL": 1.0,
+}
+
+# Batched API calls served by gasutility.batch.batch_requests at /api/batch/.
+BATCH_REQUESTS = {
+    # Sub-requests accepted by one call to /api/batch/.
+    "MAX_REQUESTS": 20,
+    # Threads used when a batch of reads asks to run in parallel.
+    "MAX_WORKERS": 4,
+}
+
 ROOT_URLCONF = 'gasutility.urls'
 
 TEMPLATES = [
@@ -95,6 +173,39 @@ DATABASES = {
     }
 }
 
+# Read replicas as a comma separated list of SQLite files, e.g.
+# DATABASE_REPLICAS=/data/replica1.sqlite3,/data/replica2.sqlite3
+for index, name in enumerate(filter(None, os.environ.get("DATABASE_REPLICAS", "").split(","))):
+    DATABASES[f"replica_{index}"] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': name.strip(),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+# Service request shards as a comma separated list of SQLite files, e.g.
+# DATABASE_SHARDS=/data/shard0.sqlite3,/data/shard1.sqlite3. Service requests,
+# their attachments and tombstones are spread across them by customer; run
+# `migrate --database shard_<n>` for each. Without shards they stay in default.
+for index, name in enumerate(filter(None, os.environ.get("DATABASE_SHARDS", "").split(","))):
+    DATABASES[f"shard_{index}"] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': name.strip(),
+    }
+
+DATABASE_ROUTERS = [
+    'service_requests.sharding.ShardRouter',
+    'gasutility.db_routers.PrimaryReplicaRouter',
+]
+
+# Ids each worker reserves at a time per shard, and the threads used to
+# query all shards at once.
+SHARD_ID_BLOCK_SIZE = 100
+SHARD_FAN_OUT_WORKERS = 8
+
+# After a successful write a user reads from the primary for this long.
+REPLICA_PIN_SECONDS = 5
+REPLICA_PIN_CACHE = 'default'
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -139,3 +250,99 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 AUTH_USER_MODEL = "accounts.User"
 
+# Deleted service requests are reported to syncing clients for this long.
+# Clients whose cursor is older must perform a full sync.
+SYNC_TOMBSTONE_RETENTION_DAYS = 30
+
+# Changed requests returned per sync call; clients call again while has_more
+# is set.
+SYNC_PAGE_SIZE = 500
+
+# updated_at is set when a change is saved, not when it commits, so the sync
+# cursor trails the present by this much and the next sync repeats changes
+# made during that time rather than miss ones that committed late.
+SYNC_CURSOR_LAG_SECONDS = 30
+
+# Resolved service requests untouched for this long are moved to the archive
+# tables by the archive_requests command.
+ARCHIVE_RESOLVED_AFTER_DAYS = 365
+
+# Responses stored for Idempotency-Key headers are replayed for this long.
+IDEMPOTENCY_KEY_TTL_HOURS = 24
+
+# A key whose request has not been answered after this long is handed to the
+# next retry, in case the worker handling it was killed. Keep it above the
+# longest a create can take, worker timeout included.
+IDEMPOTENCY_LEASE_SECONDS = 120
+
+# Status changes are POSTed to this URL by the deliver_webhooks command, in
+# batches signed with an HMAC-SHA256 of the body using SECRET. Nothing is
+# queued while URL is empty.
+WEBHOOKS = {
+    "URL": os.environ.get("WEBHOOK_URL", ""),
+    "SECRET": os.environ.get("WEBHOOK_SECRET", ""),
+    "BATCH_SIZE": 100,
+    "TIMEOUT": 5,
+    "POLL_INTERVAL": 1.0,
+    "MAX_ATTEMPTS": 12,
+    # Seconds a worker holds the entries it is sending before another may
+    # claim them; keep it well above TIMEOUT.
+    "LEASE_SECONDS": 60,
+    "BACKOFF_BASE": 2,
+    "BACKOFF_MAX": 3600,
+    "RETENTION_DAYS": 7,
+}
+
+# Attachment limits enforced by QuotaUploadHandler while the upload streams in.
+ATTACHMENT_UPLOADS = {
+    "MAX_FILE_SIZE": 10 * 1024 * 1024,
+    "MAX_REQUEST_SIZE": 25 * 1024 * 1024,
+    "ALLOWED_TYPES": ["image/jpeg", "image/png", "image/gif", "image/webp", "image/heic", "application/pdf"],
+}
+
+FILE_UPLOAD_HANDLERS = [
+    "attachments.upload_handlers.QuotaUploadHandler",
+    "django.core.files.uploadhandler.MemoryFileUploadHandler",
+    "django.core.files.uploadhandler.TemporaryFileUploadHandler",
+]
+
+# Attachment files are kept in the "attachments" storage: the local media
+# directory, or an S3-compatible bucket with ATTACHMENT_STORAGE=object. The
+# object_store_server command runs a local stand-in for the latter.
+ATTACHMENT_STORAGE_BACKENDS = {
+    "local": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "object": {
+        "BACKEND": "attachments.storage.ObjectStorage",
+        "OPTIONS": {
+            "endpoint_url": os.environ.get("OBJECT_STORE_URL", "http://127.0.0.1:9000"),
+            "bucket": os.environ.get("OBJECT_STORE_BUCKET", "attachments"),
+            "access_key": os.environ.get("OBJECT_STORE_ACCESS_KEY", ""),
+            "secret_key": os.environ.get("OBJECT_STORE_SECRET_KEY", ""),
+            "region": os.environ.get("OBJECT_STORE_REGION", "us-east-1"),
+        },
+    },
+}
+
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+    "attachments": ATTACHMENT_STORAGE_BACKENDS[os.environ.get("ATTACHMENT_STORAGE", "local")],
+}
+
+# Download links issued by the download link endpoint expire after
+# EXPIRES_SECONDS. They are HMAC-signed with SECRET (SECRET_KEY when empty)
+# and point at BASE_URL, e.g. a CDN in front of /files/, or this host.
+SIGNED_DOWNLOADS = {
+    "SECRET": os.environ.get("SIGNED_DOWNLOAD_SECRET", ""),
+    "EXPIRES_SECONDS": 300,
+    "BASE_URL": os.environ.get("SIGNED_DOWNLOAD_BASE_URL", ""),
+}
+
+# Files above this size are spooled to a temporary file instead of being held
+# in worker memory. Phone photos are usually larger, so most go to disk.
+FILE_UPLOAD_MAX_MEMORY_SIZE = 512 * 1024
+
+
+# Each worker picks up tokens revoked by other workers at most this many
+# seconds after the revocation.
+TOKEN_REVOCATION_REFRESH_SECONDS = 1.0
@@ -0,0 +1,48 @@
+from django.conf import settings
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.models import User
+
+
+def admission_settings(**overrides):
+    return override_settings(ADMISSION_CONTROL={**settings.ADMISSION_CONTROL, **overrides})
+
+
+class AdmissionControlTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("customer@example.com", "Secret-123")
+
+    def setUp(self):
+        # A new client loads the middleware, and with it the limits, under the
+        # settings of the test.
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(self.user).access_token}")
+
+    @admission_settings(BURST=2, RATE=0.5)
+    def test_rejects_callers_over_their_rate_with_429(self):
+        statuses = [self.client.get("/api/profile/").status_code for _ in range(3)]
+
+        self.assertEqual(statuses, [200, 200, 429])
+        response = self.client.get("/api/profile/")
+        self.assertEqual(response.json(), {"detail": "Rate limit exceeded."})
+        self.assertEqual(response["Retry-After"], "2")
+
+    @admission_settings(MAX_IN_FLIGHT=1, RESERVED_FOR_PRIORITY=1, RETRY_AFTER=3)
+    def test_sheds_routes_over_their_concurrency_with_503(self):
+        response = self.client.get("/api/profile/")
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json(), {"detail": "Server is busy, retry later."})
+        self.assertEqual(response["Retry-After"], "3")
+        # The reserved slot still admits priority routes.
+        response = self.client.post("/api/service-request/create/", {}, format="json")
+        self.assertNotEqual(response.status_code, 503)
+
+    @admission_settings(MAX_IN_FLIGHT=1, RESERVED_FOR_PRIORITY=0)
+    def test_releases_slots_when_requests_finish(self):
+        statuses = [self.client.get("/api/profile/").status_code for _ in range(3)]
+
+        self.assertEqual(statuses, [200, 200, 200])
@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.models import User
+
+BATCH_URL = "/api/batch/"
+
+
+class BatchRequestTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("customer@example.com", "Secret-123")
+
+    def batch(self, *entries):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(self.user).access_token}")
+        response = client.post(BATCH_URL, {"requests": list(entries)}, format="json")
+        self.assertEqual(response.status_code, 200)
+        return response.json()["responses"]
+
+    def test_sub_responses_are_not_compressed(self):
+        (result,) = self.batch({"path": "/metrics", "headers": {"Accept-Encoding": "gzip"}})
+
+        self.assertEqual(result["status"], 200)
+        self.assertIsInstance(result["body"], str)
+
+    @override_settings(ADMISSION_CONTROL={**settings.ADMISSION_CONTROL, "BURST": 2, "RATE": 0.001})
+    def test_middleware_rejections_come_back_as_json(self):
+        # The batch itself spends the first token and the first entry the last.
+        results = self.batch({"path": "/api/profile/"}, {"path": "/api/profile/"})
+
+        self.assertEqual([result["status"] for result in results], [200, 429])
+        self.assertEqual(results[1]["body"], {"detail": "Rate limit exceeded."})
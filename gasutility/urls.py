@@ -20,6 +20,10 @@ from rest_framework.permissions import AllowAny
 from rest_framework_simplejwt.views import TokenRefreshView
 from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
+
+from .batch import batch_requests
+from .metrics import metrics_view
+
 schema_view = get_schema_view(
     openapi.Info(
         title="Gas Utility API",
@@ -38,6 +42,9 @@ urlpatterns = [
     path("swagger.json", schema_view.without_ui(cache_timeout=0), name="swagger-json"),
     path("api/", include("accounts.urls")),
     path("api/", include("service_requests.urls")),
+    path("api/batch/", batch_requests, name="batch_requests"),
+    path("files/", include("attachments.urls")),
     path("api/token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
+    path("metrics", metrics_view, name="metrics"),
 ]
 
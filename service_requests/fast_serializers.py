@@ -0,0 +1,125 @@
+from collections import defaultdict
+
+from rest_framework import serializers
+
+from attachments.models import ArchivedAttachment, Attachment
+from .sharding import group_by_shard, use_shard
+
+SERVICE_REQUEST_FIELDS = (
+    "id", "customer", "support_staff", "title", "service_type", "description", "status",
+    "created_at", "updated_at",
+)
+
+# Keys of a serialized service request, in ServiceRequestSerializer order.
+RESPONSE_FIELDS = (
+    "id", "customer", "support_staff", "title", "service_type", "description", "status",
+    "uploaded_attachments", "created_at", "updated_at",
+)
+
+# Keeps the attachment lookup under SQLite's bound parameter limit.
+ATTACHMENT_LOOKUP_CHUNK = 500
+
+_datetime_field = serializers.DateTimeField()
+_file_storage = Attachment._meta.get_field("file").storage
+
+
+def parse_fields(value):
+    """
+    Turns a comma separated fields= value into a tuple of RESPONSE_FIELDS in
+    response order. Raises ValueError naming any unknown field.
+    """
+    requested = {name.strip() for name in value.split(",") if name.strip()}
+    unknown = requested.difference(RESPONSE_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}.")
+    return tuple(name for name in RESPONSE_FIELDS if name in requested)
+
+
+def service_request_rows(queryset, *extra_fields, fields=None):
+    """
+    Narrows a ServiceRequest queryset to the columns the read path renders,
+    plus any extra_fields the caller needs but which are not rendered. With
+    fields (see parse_fields) only those columns and the id are selected.
+    """
+    if fields is None:
+        columns = SERVICE_REQUEST_FIELDS
+    else:
+        columns = ("id", *(name for name in fields if name in SERVICE_REQUEST_FIELDS and name != "id"))
+    return queryset.values(*dict.fromkeys((*columns, *extra_fields)))
+
+
+def _attachments_by_request(request_ids, attachment_model):
+    attachments = defaultdict(list)
+    to_datetime = _datetime_field.to_representation
+    # Current attachments live on the shard of their request; archived ones
+    # are all in the default database.
+    if attachment_model is Attachment:
+        groups = group_by_shard(request_ids).items()
+    else:
+        groups = [(None, request_ids)]
+    for alias, ids in groups:
+        for start in range(0, len(ids), ATTACHMENT_LOOKUP_CHUNK):
+            chunk = ids[start:start + ATTACHMENT_LOOKUP_CHUNK]
+            rows = (
+                attachment_model.objects.filter(service_request_id__in=chunk)
+                .order_by("id")
+                .values_list("id", "file", "uploaded_at", "service_request_id")
+            )
+            if alias is not None:
+                with use_shard(alias):
+                    rows = list(rows)
+            for attachment_id, file_name, uploaded_at, request_id in rows:
+                attachments[request_id].append({
+                    "id": attachment_id,
+                    "file": _file_storage.url(file_name) if file_name else None,
+                    "uploaded_at": to_datetime(uploaded_at),
+                })
+    return attachments
+
+
+def serialize_service_request_rows(rows, archived=False, fields=None):
+    """
+    Read-only equivalent of ServiceRequestSerializer(many=True).data for rows
+    produced by service_request_rows(). Builds plain dicts with the same keys,
+    order and value formatting, fetching attachments in one query per chunk
+    instead of one per request. Pass archived=True for ArchivedServiceRequest rows,
+    and the same fields given to service_request_rows() for a sparse response.
+    """
+    rows = list(rows)
+    if fields is not None:
+        return _serialize_sparse_rows(rows, archived, fields)
+    attachment_model = ArchivedAttachment if archived else Attachment
+    attachments = _attachments_by_request([row["id"] for row in rows], attachment_model)
+    to_datetime = _datetime_field.to_representation
+    return [
+        {
+            "id": row["id"],
+            "customer": row["customer"],
+            "support_staff": row["support_staff"],
+            "title": row["title"],
+            "service_type": row["service_type"],
+            "description": row["description"],
+            "status": row["status"],
+            "uploaded_attachments": attachments.get(row["id"], []),
+            "created_at": to_datetime(row["created_at"]),
+            "updated_at": to_datetime(row["updated_at"]),
+        }
+        for row in rows
+    ]
+
+
+def _serialize_sparse_rows(rows, archived, fields):
+    if "uploaded_attachments" in fields:
+        attachment_model = ArchivedAttachment if archived else Attachment
+        attachments = _attachments_by_request([row["id"] for row in rows], attachment_model)
+    to_datetime = _datetime_field.to_representation
+    renderers = {
+        "uploaded_attachments": lambda row: attachments.get(row["id"], []),
+        "created_at": lambda row: to_datetime(row["created_at"]),
+        "updated_at": lambda row: to_datetime(row["updated_at"]),
+    }
+    columns = [(name, renderers.get(name)) for name in fields]
+    return [
+        {name: render(row) if render else row[name] for name, render in columns}
+        for row in rows
+    ]
@@ -0,0 +1,65 @@
+import hashlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import IdempotencyKey
+
+
+def request_fingerprint(request):
+    """
+    Hashes the submitted form fields, and the names and sizes of uploaded files,
+    so a key reused for a different request can be told apart from a retry.
+    """
+    digest = hashlib.sha256()
+    for name, values in sorted(request.data.lists()):
+        for value in values:
+            if hasattr(value, "size"):
+                value = f"{value.name}:{value.size}"
+            digest.update(f"{name}={value}\0".encode())
+    return digest.hexdigest()
+
+
+def claim_key(user, key, fingerprint):
+    """
+    Records that user started a request with key. Returns (record, True) for a
+    new key, or the existing unexpired record and False. Expired records are
+    evicted and the key is claimed afresh, as is a record of the same request
+    still unanswered after IDEMPOTENCY_LEASE_SECONDS, whose worker is taken to
+    have died.
+    """
+    now = timezone.now()
+    expires_before = now - timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS)
+    lease_before = now - timedelta(seconds=settings.IDEMPOTENCY_LEASE_SECONDS)
+    for _ in range(2):
+        try:
+            with transaction.atomic():
+                return IdempotencyKey.objects.create(user=user, key=key, fingerprint=fingerprint), True
+        except IntegrityError:
+            record = IdempotencyKey.objects.filter(user=user, key=key).first()
+            if record is None:
+                continue
+            if record.status_code is None and record.fingerprint == fingerprint and record.created_at < lease_before:
+                # Only one retry takes the lease over; the others see it renewed.
+                if IdempotencyKey.objects.filter(
+                    id=record.id, status_code__isnull=True, created_at=record.created_at
+                ).update(created_at=now):
+                    return record, True
+                continue
+            if record.created_at >= expires_before:
+                return record, False
+            IdempotencyKey.objects.filter(id=record.id).delete()
+    return IdempotencyKey.objects.create(user=user, key=key, fingerprint=fingerprint), True
+
+
+def store_response(record, response):
+    """Saves the outcome for replay; server errors release the key so the client can retry."""
+    if response.status_code >= 500:
+        record.delete()
+        return
+    IdempotencyKey.objects.filter(id=record.id).update(
+        status_code=response.status_code,
+        response_body=response.data,
+    )
@@ -0,0 +1,73 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from attachments.models import ArchivedAttachment, Attachment
+from service_requests.models import ArchivedServiceRequest, ServiceRequest
+from service_requests.sharding import all_shards, current_shard, use_shard
+
+ARCHIVED_REQUEST_FIELDS = (
+    "id", "customer_id", "support_staff_id", "title", "description", "status",
+    "created_at", "updated_at", "service_type",
+)
+ARCHIVED_ATTACHMENT_FIELDS = (
+    "id", "file", "service_request_id", "uploaded_at", "original_name", "sha256", "size", "content_type",
+)
+
+
+class Command(BaseCommand):
+    help = "Moves resolved service requests and their attachments to the archive tables in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than-days",
+            type=int,
+            default=settings.ARCHIVE_RESOLVED_AFTER_DAYS,
+            help="Archive requests resolved at least this many days ago "
+                 "(defaults to ARCHIVE_RESOLVED_AFTER_DAYS).",
+        )
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--max-batches", type=int, help="Stop after this many batches.")
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options["older_than_days"])
+        candidates = ServiceRequest.objects.filter(status="resolved", updated_at__lt=cutoff).order_by("id")
+
+        archived = batches = 0
+        for alias in all_shards():
+            with use_shard(alias):
+                while options["max_batches"] is None or batches < options["max_batches"]:
+                    ids = list(candidates.values_list("id", flat=True)[:options["batch_size"]])
+                    if not ids:
+                        break
+                    archived += self._archive_batch(ids)
+                    batches += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {archived} service requests resolved before {cutoff.isoformat()}."
+        ))
+
+    def _archive_batch(self, ids):
+        requests = ServiceRequest.objects.filter(id__in=ids)
+        attachments = Attachment.objects.filter(service_request_id__in=ids)
+
+        # The archive tables are in the default database while the rows may be
+        # on a shard. The archive commits first; should the shard then fail to
+        # commit, the next run copies the same rows again and skips conflicts.
+        with transaction.atomic(using=current_shard()), transaction.atomic(using="default"):
+            ArchivedServiceRequest.objects.bulk_create(
+                (ArchivedServiceRequest(**row) for row in requests.values(*ARCHIVED_REQUEST_FIELDS)),
+                ignore_conflicts=True,
+            )
+            ArchivedAttachment.objects.bulk_create(
+                (ArchivedAttachment(**row) for row in attachments.values(*ARCHIVED_ATTACHMENT_FIELDS)),
+                ignore_conflicts=True,
+            )
+
+            # Queryset deletes skip Attachment.delete(), so the stored files stay in
+            # place for the archived rows that now point at them.
+            attachments.delete()
+            return requests.delete()[1].get(ServiceRequest._meta.label, 0)
@@ -0,0 +1,109 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count, DurationField, ExpressionWrapper, F, Sum
+from django.db.models.functions import TruncHour
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from service_requests.models import ArchivedServiceRequest, ServiceRequest, StatusRollup
+from service_requests.rollups import COUNTERS, bucket_start
+from service_requests.sharding import all_shards, current_shard, use_shard
+
+RESOLUTION_TIME = ExpressionWrapper(F("updated_at") - F("created_at"), output_field=DurationField())
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuilds the hourly and daily status rollups from service requests, one window of days at a time. "
+        "Current data only records when a request was created and last resolved, so reopenings and deletions "
+        "inside the window are not restored."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--since", required=True, help="First UTC day to rebuild, YYYY-MM-DD.")
+        parser.add_argument("--until", help="UTC day to stop before, YYYY-MM-DD (defaults to tomorrow).")
+        parser.add_argument("--window-days", type=int, default=7, help="Days rebuilt per transaction.")
+
+    def handle(self, *args, **options):
+        since = self._parse_day(options["since"])
+        if options["until"]:
+            until = self._parse_day(options["until"])
+        else:
+            until = bucket_start(timezone.now(), "day") + timedelta(days=1)
+        if since >= until:
+            raise CommandError("--since must be before --until.")
+
+        written = 0
+        window = timedelta(days=options["window_days"])
+        for alias in all_shards():
+            with use_shard(alias):
+                # Archived requests live on the default database; their counts
+                # are folded into the first shard's rollups.
+                archived = alias == all_shards()[0]
+                start = since
+                while start < until:
+                    end = min(start + window, until)
+                    written += self._rebuild(start, end, archived)
+                    start = end
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {written} rollup rows from {since.date()} to {until.date()}."
+        ))
+
+    def _parse_day(self, value):
+        day = parse_date(value)
+        if day is None:
+            raise CommandError(f"Invalid date: {value}")
+        return datetime(day.year, day.month, day.day, tzinfo=dt_timezone.utc)
+
+    def _rebuild(self, start, end, archived):
+        # Deleting the window first takes the write lock, so live increments
+        # wait for this transaction instead of landing between the reads and
+        # the reinsert and being overwritten.
+        with transaction.atomic(using=current_shard()):
+            StatusRollup.objects.filter(bucket__gte=start, bucket__lt=end).delete()
+            rows = self._aggregate(start, end, archived)
+            StatusRollup.objects.bulk_create(rows, batch_size=1000)
+        return len(rows)
+
+    def _aggregate(self, start, end, archived):
+        querysets = [ServiceRequest.objects.all()]
+        if archived:
+            querysets.append(ArchivedServiceRequest.objects.all())
+
+        hours = {}
+        for queryset in querysets:
+            created = queryset.filter(created_at__gte=start, created_at__lt=end)
+            resolved = queryset.filter(status="resolved", updated_at__gte=start, updated_at__lt=end)
+            self._add(hours, created.annotate(bucket=TruncHour("created_at")), created=Count("id"))
+            self._add(
+                hours,
+                resolved.annotate(bucket=TruncHour("updated_at")),
+                resolved=Count("id"),
+                resolution_seconds=Sum(RESOLUTION_TIME),
+            )
+
+        days = {}
+        for (bucket, service_type, support_staff_id), counters in hours.items():
+            key = (bucket_start(bucket, "day"), service_type, support_staff_id)
+            day = days.setdefault(key, dict.fromkeys(COUNTERS, 0))
+            for field in COUNTERS:
+                day[field] += counters[field]
+
+        return [
+            StatusRollup(
+                period=period, bucket=bucket, service_type=service_type, support_staff_id=support_staff_id, **counters
+            )
+            for period, buckets in (("hour", hours), ("day", days))
+            for (bucket, service_type, support_staff_id), counters in buckets.items()
+        ]
+
+    def _add(self, hours, queryset, **aggregates):
+        for row in queryset.values("bucket", "service_type", "support_staff_id").annotate(**aggregates).order_by():
+            key = (row["bucket"], row["service_type"], row["support_staff_id"] or 0)
+            counters = hours.setdefault(key, dict.fromkeys(COUNTERS, 0))
+            for field in aggregates:
+                value = row[field]
+                counters[field] += value.total_seconds() if isinstance(value, timedelta) else value
@@ -0,0 +1,81 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from gasutility.compression import available_codecs, compress, compress_stream
+from service_requests.fast_serializers import service_request_rows, serialize_service_request_rows
+from service_requests.models import ServiceRequest
+
+WORDS = (
+    "gas meter leak pressure valve regulator pipe kitchen boiler smell inspection "
+    "installation replacement connection customer reported technician visit urgent"
+).split()
+
+
+def synthetic_rows(count, seed=0):
+    rng = random.Random(seed)
+    return [
+        {
+            "id": index,
+            "customer": rng.randint(1, 50000),
+            "support_staff": rng.randint(1, 500),
+            "title": " ".join(rng.choices(WORDS, k=5)),
+            "service_type": rng.choice(["installation", "maintenance", "repair"]),
+            "description": " ".join(rng.choices(WORDS, k=40)),
+            "status": rng.choice(["pending", "in_progress", "resolved"]),
+            "uploaded_attachments": [
+                {
+                    "id": index * 10 + n,
+                    "file": f"/attachments/uploads/{rng.getrandbits(40):x}.jpeg",
+                    "uploaded_at": "2025-02-23T10:10:00.123456Z",
+                }
+                for n in range(rng.randint(0, 3))
+            ],
+            "created_at": "2025-02-23T10:10:00.123456Z",
+            "updated_at": "2025-02-24T08:01:02.654321Z",
+        }
+        for index in range(1, count + 1)
+    ]
+
+
+class Command(BaseCommand):
+    help = "Measures CPU cost against bytes saved for each available response compression codec."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=100, help="Service requests per payload (page_size).")
+        parser.add_argument("--iterations", type=int, default=200)
+        parser.add_argument(
+            "--from-db",
+            action="store_true",
+            help="Build the payload from stored service requests instead of synthetic rows.",
+        )
+
+    def handle(self, *args, **options):
+        if options["from_db"]:
+            rows = serialize_service_request_rows(
+                service_request_rows(ServiceRequest.objects.order_by("id")[:options["rows"]])
+            )
+        else:
+            rows = synthetic_rows(options["rows"])
+        payload = JSONRenderer().render({"count": len(rows), "next": None, "previous": None, "results": rows})
+        chunks = [payload[start:start + 8192] for start in range(0, len(payload), 8192)]
+        iterations = options["iterations"]
+
+        self.stdout.write(f"Payload: {len(rows)} rows, {len(payload)} bytes, {iterations} iterations")
+        self.stdout.write(f"{'codec':<8}{'mode':<11}{'bytes':>10}{'ratio':>8}{'ms/op':>9}{'MB/s':>9}")
+        for codec in available_codecs():
+            for mode, run in (
+                ("buffered", lambda: compress(codec, payload)),
+                ("streaming", lambda: b"".join(compress_stream(codec, chunks))),
+            ):
+                size = len(run())
+                start = time.perf_counter()
+                for _ in range(iterations):
+                    run()
+                elapsed = (time.perf_counter() - start) / iterations
+                self.stdout.write(
+                    f"{codec.name:<8}{mode:<11}{size:>10}{len(payload) / size:>8.2f}"
+                    f"{elapsed * 1000:>9.3f}{len(payload) / elapsed / 1e6:>9.1f}"
+                )
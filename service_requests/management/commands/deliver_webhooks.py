@@ -0,0 +1,147 @@
+import json
+import logging
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, Max
+from django.utils import timezone
+
+from service_requests import webhooks
+from service_requests.models import WebhookOutbox
+from service_requests.sharding import all_shards, use_shard
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Delivers queued status change webhooks in signed batches, keeping only the latest change per "
+        "request and retrying failed batches with exponential backoff until WEBHOOKS MAX_ATTEMPTS, after "
+        "which entries are marked failed and logged. Several workers may run at once. Runs until stopped "
+        "unless --once."
+    )
+
+    def add_arguments(self, parser):
+        config = settings.WEBHOOKS
+        parser.add_argument("--url", default=config["URL"], help="Endpoint to POST to (defaults to WEBHOOKS URL).")
+        parser.add_argument("--batch-size", type=int, default=config["BATCH_SIZE"])
+        parser.add_argument("--interval", type=float, default=config["POLL_INTERVAL"],
+                            help="Seconds to wait when there is nothing to deliver.")
+        parser.add_argument("--once", action="store_true", help="Deliver what is due and exit.")
+
+    def handle(self, *args, **options):
+        if not options["url"]:
+            raise CommandError("Set WEBHOOK_URL or pass --url.")
+
+        while True:
+            delivered = failed = 0
+            for alias in all_shards():
+                with use_shard(alias):
+                    shard_delivered, shard_failed = self._deliver_due(options)
+                    self._dead_letter()
+                    self._prune()
+                delivered += shard_delivered
+                failed += shard_failed
+            if delivered or failed:
+                self.stdout.write(f"Delivered {delivered} events, {failed} failed.")
+            if options["once"]:
+                break
+            if not delivered:
+                time.sleep(options["interval"])
+
+    def _deliver_due(self, options):
+        """Sends due entries of the selected shard batch by batch; returns (delivered, failed) counts."""
+        config = settings.WEBHOOKS
+        delivered = failed = 0
+        while True:
+            due = self._claim(options["batch_size"])
+            if not due:
+                return delivered, failed
+            due = self._drop_superseded(due)
+            if not due:
+                continue
+
+            ids = [entry.id for entry in due]
+            events = webhooks.coalesce(due)
+            body = json.dumps({"events": events}, cls=DjangoJSONEncoder).encode()
+            try:
+                webhooks.post(options["url"], body, config["SECRET"], config["TIMEOUT"])
+            except OSError as exc:
+                attempts = max(entry.attempts for entry in due) + 1
+                WebhookOutbox.objects.filter(id__in=ids).update(
+                    attempts=F("attempts") + 1,
+                    next_attempt_at=timezone.now() + webhooks.retry_delay(attempts),
+                )
+                self.stderr.write(f"Delivery of {len(events)} events failed (attempt {attempts}): {exc}")
+                return delivered, failed + len(events)
+
+            WebhookOutbox.objects.filter(id__in=ids).update(delivered_at=timezone.now())
+            delivered += len(events)
+
+    def _claim(self, batch_size):
+        """
+        Leases up to batch_size due entries to this worker and returns them.
+        The lease is a conditional UPDATE, so of several workers reading the
+        same entries only one sends them; the others get what is left.
+        """
+        config = settings.WEBHOOKS
+        now = timezone.now()
+        due = WebhookOutbox.objects.filter(
+            delivered_at__isnull=True,
+            next_attempt_at__lte=now,
+            attempts__lt=config["MAX_ATTEMPTS"],
+        )
+        while True:
+            ids = list(due.order_by("id").values_list("id", flat=True)[:batch_size])
+            if not ids:
+                return []
+            lease_id = uuid.uuid4()
+            # Should this worker die, the entries become due again once the lease ends.
+            due.filter(id__in=ids).update(
+                lease_id=lease_id, next_attempt_at=now + timedelta(seconds=config["LEASE_SECONDS"])
+            )
+            claimed = list(WebhookOutbox.objects.filter(id__in=ids, lease_id=lease_id).order_by("id"))
+            # Otherwise another worker took all of them; look again.
+            if claimed:
+                return claimed
+
+    def _drop_superseded(self, entries):
+        """
+        Marks entries that have a newer one for the same request as delivered
+        without sending them, and returns the rest. An older status retried
+        after backing off must not reach the endpoint after a newer one.
+        """
+        latest = dict(
+            WebhookOutbox.objects.filter(service_request_id__in={entry.service_request_id for entry in entries})
+            .values("service_request_id")
+            .annotate(latest_id=Max("id"))
+            .values_list("service_request_id", "latest_id")
+        )
+        superseded = [entry.id for entry in entries if entry.id < latest[entry.service_request_id]]
+        if superseded:
+            WebhookOutbox.objects.filter(id__in=superseded).update(delivered_at=timezone.now())
+        return [entry for entry in entries if entry.id == latest[entry.service_request_id]]
+
+    def _dead_letter(self):
+        """Marks entries that used up their attempts as failed and reports them."""
+        given_up = WebhookOutbox.objects.filter(
+            delivered_at__isnull=True,
+            failed_at__isnull=True,
+            attempts__gte=settings.WEBHOOKS["MAX_ATTEMPTS"],
+        )
+        entries = list(given_up.order_by("id").values_list("id", "service_request_id"))
+        if not entries:
+            return
+        given_up.filter(id__in=[entry_id for entry_id, _ in entries]).update(failed_at=timezone.now())
+        for entry_id, request_id in entries:
+            logger.error("Gave up delivering webhook %s for service request %s.", entry_id, request_id)
+        self.stderr.write(f"Gave up on {len(entries)} events after {settings.WEBHOOKS['MAX_ATTEMPTS']} attempts.")
+
+    def _prune(self):
+        cutoff = timezone.now() - timedelta(days=settings.WEBHOOKS["RETENTION_DAYS"])
+        WebhookOutbox.objects.filter(delivered_at__lt=cutoff).delete()
+        WebhookOutbox.objects.filter(failed_at__lt=cutoff).delete()
@@ -0,0 +1,199 @@
+import hashlib
+import random
+import time
+from datetime import timedelta
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from accounts.models import User
+from attachments.models import Attachment
+from service_requests.models import ServiceRequest
+from service_requests.sharding import shard_aliases
+
+STATUS_WEIGHTS = {"pending": 15, "in_progress": 20, "resolved": 65}
+SERVICE_TYPE_WEIGHTS = {"maintenance": 50, "repair": 35, "installation": 15}
+WORDS = (
+    "gas meter leak pressure valve regulator pipe kitchen boiler smell inspection installation "
+    "replacement connection reported visit urgent heater stove supply outage reading faulty"
+).split()
+DUMMY_FILE_CONTENT = b"\xff\xd8\xff\xe0" + b"\x00" * 2044
+
+
+class Command(BaseCommand):
+    help = (
+        "Generates a seeded synthetic dataset of customers, support staff, service requests and "
+        "attachments for load testing, using batched bulk inserts and one precomputed password hash."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--customers", type=int, default=10_000)
+        parser.add_argument("--staff", type=int, default=200)
+        parser.add_argument("--requests", type=int, default=100_000)
+        parser.add_argument("--attachments-per-request", type=float, default=0.5,
+                            help="Average number of attachments per request.")
+        parser.add_argument("--staff-skew", type=float, default=1.1,
+                            help="Zipf exponent of the per-staff load; 0 spreads work evenly.")
+        parser.add_argument("--days", type=int, default=730, help="Spread created_at over this many days.")
+        parser.add_argument("--dummy-files", type=int, default=20)
+        parser.add_argument("--password", default="loadtest-password")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--batch-size", type=int, default=10_000)
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options["seed"])
+        self.batch_size = options["batch_size"]
+        self.email_prefix = f"loadtest-{options['seed']}-"
+        if shard_aliases():
+            raise CommandError("Datasets are inserted into the default database only; unset DATABASE_SHARDS.")
+        if User.objects.filter(email__startswith=self.email_prefix).exists():
+            raise CommandError(f"A dataset with seed {options['seed']} already exists.")
+
+        if connection.vendor == "sqlite" and not connection.in_atomic_block:
+            # Durability is not worth paying for on throwaway load test data.
+            with connection.cursor() as cursor:
+                cursor.execute("PRAGMA synchronous = OFF")
+                cursor.execute("PRAGMA journal_mode = MEMORY")
+
+        started = time.perf_counter()
+        customer_ids = self._create_users("customer", options["customers"], options["password"])
+        staff_ids = self._create_users("support_staff", options["staff"], options["password"])
+        files = self._create_dummy_files(options["dummy_files"])
+        requests, attachments = self._create_requests(
+            options["requests"], customer_ids, staff_ids, files, options
+        )
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), [User, ServiceRequest, Attachment]):
+                cursor.execute(sql)
+
+        elapsed = time.perf_counter() - started
+        total = len(customer_ids) + len(staff_ids) + requests + attachments
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {len(customer_ids)} customers, {len(staff_ids)} staff, {requests} requests and "
+            f"{attachments} attachments in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s)."
+        ))
+
+    def _next_id(self, model):
+        return (model.objects.aggregate(max_id=Max("id"))["max_id"] or 0) + 1
+
+    def _create_users(self, role, count, password):
+        password_hash = make_password(password)
+        service_types = list(SERVICE_TYPE_WEIGHTS)
+        next_id = self._next_id(User)
+        ids = list(range(next_id, next_id + count))
+        for start in range(0, count, self.batch_size):
+            users = []
+            for user_id in ids[start:start + self.batch_size]:
+                skills = []
+                if role == "support_staff" and self.rng.random() < 0.5:
+                    skills = self.rng.sample(service_types, self.rng.randint(1, 2))
+                users.append(User(
+                    id=user_id,
+                    email=f"{self.email_prefix}{role}-{user_id}@example.com",
+                    first_name=self.rng.choice(["Asha", "Ravi", "Meera", "John", "Lena", "Omar", "Yuki"]),
+                    last_name=self.rng.choice(["Patel", "Singh", "Smith", "Garcia", "Khan", "Chen"]),
+                    password=password_hash,
+                    role=role,
+                    skills=skills,
+                ))
+            with transaction.atomic():
+                User.objects.bulk_create(users)
+        return ids
+
+    def _create_dummy_files(self, count):
+        """Returns the Attachment column values (file, original_name, sha256, size, content_type) per file."""
+        storage = Attachment._meta.get_field("file").storage
+        files = []
+        for index in range(count):
+            name = f"attachments/uploads/loadtest/dummy-{index}.jpeg"
+            if storage.exists(name):
+                with storage.open(name) as existing:
+                    content = existing.read()
+            else:
+                content = DUMMY_FILE_CONTENT + index.to_bytes(4, "big")
+                name = storage.save(name, ContentFile(content))
+            files.append((name, f"dummy-{index}.jpeg", hashlib.sha256(content).hexdigest(), len(content), "image/jpeg"))
+        return files
+
+    def _create_requests(self, count, customer_ids, staff_ids, files, options):
+        rng = self.rng
+        statuses, status_weights = zip(*STATUS_WEIGHTS.items())
+        status_weights = list(accumulate(status_weights))
+        service_types, type_weights = zip(*SERVICE_TYPE_WEIGHTS.items())
+        type_weights = list(accumulate(type_weights))
+        staff_weights = list(accumulate(1 / (rank + 1) ** options["staff_skew"] for rank in range(len(staff_ids))))
+        titles = [" ".join(rng.choices(WORDS, k=4)).capitalize() for _ in range(1000)]
+        descriptions = [
+            " ".join(rng.choices(WORDS, k=rng.randint(10, 40))).capitalize() + "." for _ in range(1000)
+        ]
+        now = timezone.now()
+        span = options["days"] * 86400
+        attachment_rate = options["attachments_per_request"]
+
+        # Rows are inserted with executemany: building model instances and
+        # letting bulk_create prepare every value costs more than the inserts.
+        if connection.vendor == "sqlite":
+            to_db_datetime = lambda value: str(value.replace(tzinfo=None))
+        else:
+            to_db_datetime = lambda value: value
+        request_sql = self._insert_sql(ServiceRequest, (
+            "id", "customer", "support_staff", "title", "description", "status",
+            "created_at", "updated_at", "service_type", "version",
+        ))
+        attachment_sql = self._insert_sql(Attachment, (
+            "id", "service_request", "uploaded_at", "file", "original_name", "sha256", "size", "content_type",
+        ))
+
+        request_id = self._next_id(ServiceRequest)
+        attachment_id = self._next_id(Attachment)
+        created_requests = created_attachments = 0
+        while created_requests < count:
+            batch_started = time.perf_counter()
+            size = min(self.batch_size, count - created_requests)
+            batch_statuses = rng.choices(statuses, cum_weights=status_weights, k=size)
+            batch_types = rng.choices(service_types, cum_weights=type_weights, k=size)
+            batch_customers = rng.choices(customer_ids, k=size)
+            batch_staff = rng.choices(staff_ids, cum_weights=staff_weights, k=size) if staff_ids else [None] * size
+
+            requests, attachments = [], []
+            for index in range(size):
+                status = batch_statuses[index]
+                created_at = now - timedelta(seconds=rng.random() * span)
+                if status == "pending":
+                    updated_at = created_at
+                else:
+                    updated_at = min(now, created_at + timedelta(seconds=rng.expovariate(1 / 172800)))
+                created_at_value = to_db_datetime(created_at)
+                requests.append((
+                    request_id, batch_customers[index], batch_staff[index], rng.choice(titles),
+                    rng.choice(descriptions), status, created_at_value, to_db_datetime(updated_at),
+                    batch_types[index], 1,
+                ))
+                attachment_count = int(attachment_rate) + (rng.random() < attachment_rate % 1)
+                for _ in range(attachment_count if files else 0):
+                    attachments.append((attachment_id, request_id, created_at_value, *rng.choice(files)))
+                    attachment_id += 1
+                request_id += 1
+
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.executemany(request_sql, requests)
+                if attachments:
+                    cursor.executemany(attachment_sql, attachments)
+            created_requests += size
+            created_attachments += len(attachments)
+            rate = (size + len(attachments)) / (time.perf_counter() - batch_started)
+            self.stdout.write(f"{created_requests}/{count} requests ({rate:,.0f} rows/s)")
+
+        return created_requests, created_attachments
+
+    def _insert_sql(self, model, field_names):
+        quote_name = connection.ops.quote_name
+        columns = ", ".join(quote_name(model._meta.get_field(name).column) for name in field_names)
+        placeholders = ", ".join(["%s"] * len(field_names))
+        return f"INSERT INTO {quote_name(model._meta.db_table)} ({columns}) VALUES ({placeholders})"
@@ -0,0 +1,50 @@
+import os
+import pstats
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from gasutility.profiling import issue_token
+
+
+class Command(BaseCommand):
+    help = "Aggregates stored request profiles into a report of the hottest functions."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--view", action="append", help="Only include these views (repeatable).")
+        parser.add_argument("--top", type=int, default=25)
+        parser.add_argument("--sort", choices=["cumulative", "tottime", "ncalls"], default="tottime")
+        parser.add_argument("--since-hours", type=float, help="Only include profiles newer than this.")
+        parser.add_argument(
+            "--issue-token",
+            action="store_true",
+            help="Print an X-Profile header value that forces profiling, then exit.",
+        )
+
+    def handle(self, *args, **options):
+        if options["issue_token"]:
+            self.stdout.write(issue_token())
+            return
+
+        directory = settings.PROFILING["DIR"]
+        views = options["view"] or (sorted(os.listdir(directory)) if os.path.isdir(directory) else [])
+        cutoff = time.time() - options["since_hours"] * 3600 if options["since_hours"] else 0
+
+        for view in views:
+            view_directory = os.path.join(directory, view)
+            if not os.path.isdir(view_directory):
+                raise CommandError(f"No profiles stored for view '{view}'.")
+            paths = [
+                os.path.join(view_directory, name)
+                for name in sorted(os.listdir(view_directory))
+                if name.endswith(".prof") and os.path.getmtime(os.path.join(view_directory, name)) >= cutoff
+            ]
+            if not paths:
+                continue
+
+            stats = pstats.Stats(paths[0], stream=self.stdout)
+            for path in paths[1:]:
+                stats.add(path)
+            self.stdout.write(self.style.MIGRATE_HEADING(f"{view}: {len(paths)} profiled requests"))
+            stats.strip_dirs().sort_stats(options["sort"]).print_stats(options["top"])
@@ -0,0 +1,36 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from service_requests.models import ServiceRequestTombstone
+from service_requests.sharding import all_shards, use_shard
+
+
+class Command(BaseCommand):
+    help = "Deletes service request tombstones older than the sync retention window."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.SYNC_TOMBSTONE_RETENTION_DAYS,
+            help="Retention window in days (defaults to SYNC_TOMBSTONE_RETENTION_DAYS).",
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options["days"])
+        expired = ServiceRequestTombstone.objects.filter(deleted_at__lt=cutoff)
+
+        total = 0
+        for alias in all_shards():
+            with use_shard(alias):
+                while True:
+                    ids = list(expired.values_list("id", flat=True)[:options["batch_size"]])
+                    if not ids:
+                        break
+                    total += ServiceRequestTombstone.objects.filter(id__in=ids).delete()[0]
+
+        self.stdout.write(self.style.SUCCESS(f"Deleted {total} tombstones older than {cutoff.isoformat()}."))
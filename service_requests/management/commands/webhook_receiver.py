@@ -0,0 +1,47 @@
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from service_requests import webhooks
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs a local stand-in for a partner webhook endpoint that checks signatures and prints the "
+        "events it receives. Point deliver_webhooks at it with --url http://127.0.0.1:<port>/."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--port", type=int, default=8765)
+        parser.add_argument("--status", type=int, default=204, help="Status code to answer valid deliveries with.")
+
+    def handle(self, *args, **options):
+        command = self
+        secret = settings.WEBHOOKS["SECRET"]
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                if not webhooks.verify(body, self.headers.get(webhooks.SIGNATURE_HEADER), secret):
+                    command.stderr.write("Rejected delivery with an invalid signature.")
+                    self.send_response(401)
+                else:
+                    for event in json.loads(body)["events"]:
+                        command.stdout.write(json.dumps(event))
+                    self.send_response(options["status"])
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", options["port"]), Handler)
+        self.stdout.write(f"Listening on http://127.0.0.1:{options['port']}/")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
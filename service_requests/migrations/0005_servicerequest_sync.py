@@ -0,0 +1,50 @@
+# Generated by Django 5.1.6 on 2026-10-19 14:24
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('service_requests', '0004_servicerequest_service_type'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ServiceRequestTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('request_id', models.BigIntegerField()),
+                ('deleted_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='servicerequest',
+            index=models.Index(fields=['customer', 'updated_at'], name='service_req_custome_889544_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='servicerequest',
+            index=models.Index(fields=['support_staff', 'updated_at'], name='service_req_support_33e3dd_idx'),
+        ),
+        migrations.AddField(
+            model_name='servicerequesttombstone',
+            name='customer',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='servicerequesttombstone',
+            name='support_staff',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='servicerequesttombstone',
+            index=models.Index(fields=['customer', 'deleted_at'], name='service_req_custome_6379bd_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='servicerequesttombstone',
+            index=models.Index(fields=['support_staff', 'deleted_at'], name='service_req_support_87c179_idx'),
+        ),
+    ]
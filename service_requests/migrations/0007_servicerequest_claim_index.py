@@ -0,0 +1,19 @@
+# Generated by Django 5.1.6 on 2026-10-19 14:30
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('service_requests', '0006_archivedservicerequest'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='servicerequest',
+            index=models.Index(fields=['status', 'service_type', 'created_at'], name='service_req_status_4dd1d2_idx'),
+        ),
+    ]
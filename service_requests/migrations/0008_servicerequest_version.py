@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-19 14:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('service_requests', '0007_servicerequest_claim_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='servicerequest',
+            name='version',
+            field=models.PositiveIntegerField(default=1),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.6 on 2026-10-19 15:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('service_requests', '0012_statusrollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='statusrollup',
+            name='reassigned_in',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='statusrollup',
+            name='reassigned_out',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-19 15:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('service_requests', '0013_statusrollup_reassignments'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='servicerequesttombstone',
+            name='reason',
+            field=models.CharField(choices=[('deleted', 'Deleted'), ('reassigned', 'Reassigned')], default='deleted', max_length=10),
+        ),
+    ]
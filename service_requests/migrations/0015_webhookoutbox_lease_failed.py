@@ -0,0 +1,23 @@
+# Generated by Django 5.1.6 on 2026-10-19 15:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('service_requests', '0014_tombstone_reason'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='webhookoutbox',
+            name='failed_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='webhookoutbox',
+            name='lease_id',
+            field=models.UUIDField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-19 15:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('service_requests', '0015_webhookoutbox_lease_failed'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='webhookoutbox',
+            name='service_request_id',
+            field=models.BigIntegerField(db_index=True),
+        ),
+    ]
@@ -2,8 +2,10 @@ import random
 from django.db import models
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 
 from attachments.models import Attachment
+from .sharding import assign_id
 
 
 class ServiceRequest(models.Model):
@@ -18,15 +20,19 @@ class ServiceRequest(models.Model):
         ("repair", "Repair"),
     ]
 
+    # Requests may live on a different database shard than users, so the
+    # user foreign keys are not enforced by the database.
     customer = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
+        db_constraint=False,
         related_name="requests"
     )
     support_staff = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.SET_NULL,
         null=True, blank=True,
+        db_constraint=False,
         related_name="assigned_requests"
     )
     title = models.CharField(max_length=255)
@@ -35,17 +41,204 @@ class ServiceRequest(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     service_type = models.CharField(max_length=20, choices=SERVICE_TYPES, default="maintenance")
+    version = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["customer", "updated_at"]),
+            models.Index(fields=["support_staff", "updated_at"]),
+            models.Index(fields=["status", "service_type", "created_at"]),
+        ]
 
     def assign_support_staff(self):
         User = get_user_model()
-        support_staff_users = User.objects.filter(role="support_staff")
-        if support_staff_users.exists():
-            self.support_staff = random.choice(support_staff_users)
+        support_staff_ids = list(User.objects.filter(role="support_staff").values_list("id", flat=True))
+        if support_staff_ids:
+            self.support_staff_id = random.choice(support_staff_ids)
 
     def save(self, *args, **kwargs):
-        if self.support_staff is None:
+        if self.support_staff_id is None:
             self.assign_support_staff()
+        assign_id(self)
         super().save(*args, **kwargs)
 
     def __str__(self):
         return f"Request {self.id} - {self.status}"
+
+
+class ServiceRequestTombstone(models.Model):
+    """
+    Compact record of a request that left someone's list, kept so clients can
+    sync removals: a deleted request, or one claimed away from the support
+    staff member it was assigned to (only that staff member sees the latter).
+    """
+
+    REASONS = [
+        ("deleted", "Deleted"),
+        ("reassigned", "Reassigned"),
+    ]
+
+    request_id = models.BigIntegerField()
+    customer = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        db_index=False,
+        db_constraint=False,
+        related_name="+"
+    )
+    support_staff = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True, blank=True,
+        db_index=False,
+        db_constraint=False,
+        related_name="+"
+    )
+    deleted_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    reason = models.CharField(max_length=10, choices=REASONS, default="deleted")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["customer", "deleted_at"]),
+            models.Index(fields=["support_staff", "deleted_at"]),
+        ]
+
+    def __str__(self):
+        return f"Tombstone {self.request_id} - {self.deleted_at}"
+
+
+class ArchivedServiceRequest(models.Model):
+    """Resolved request moved out of the hot ServiceRequest table by archive_requests."""
+
+    id = models.BigIntegerField(primary_key=True)
+    customer = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        db_index=False,
+        related_name="archived_requests"
+    )
+    support_staff = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True, blank=True,
+        db_index=False,
+        related_name="archived_assigned_requests"
+    )
+    title = models.CharField(max_length=255)
+    description = models.TextField()
+    status = models.CharField(max_length=15, choices=ServiceRequest.STATUS_CHOICES)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    service_type = models.CharField(max_length=20, choices=ServiceRequest.SERVICE_TYPES)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["customer", "updated_at"]),
+            models.Index(fields=["support_staff", "updated_at"]),
+        ]
+
+    def __str__(self):
+        return f"Archived request {self.id} - {self.status}"
+
+
+class IdempotencyKey(models.Model):
+    """Outcome of a create_service_request call, replayed for retries carrying the same key."""
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        db_index=False,
+        related_name="+"
+    )
+    key = models.CharField(max_length=255)
+    fingerprint = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_body = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "key"], name="unique_idempotency_key_per_user"),
+        ]
+
+    def __str__(self):
+        return f"Idempotency key {self.key} - {self.status_code}"
+
+
+class IdBlock(models.Model):
+    """Counter from which sharded rows reserve blocks of ids, see sharding.IdAllocator."""
+
+    name = models.CharField(max_length=100, primary_key=True)
+    next_value = models.BigIntegerField()
+
+    def __str__(self):
+        return f"{self.name} - {self.next_value}"
+
+
+class WebhookOutbox(models.Model):
+    """
+    Status change waiting to be sent to WEBHOOKS["URL"] by deliver_webhooks.
+    Written in the transaction that changed the status, on the same shard.
+
+    A worker claims entries by moving next_attempt_at past the delivery and
+    tagging them with its lease_id. Entries still failing after
+    WEBHOOKS["MAX_ATTEMPTS"] get failed_at and are not retried; entries with
+    a newer one for the same request are marked delivered unsent.
+    """
+
+    service_request_id = models.BigIntegerField(db_index=True)
+    payload = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    lease_id = models.UUIDField(null=True, blank=True)
+    delivered_at = models.DateTimeField(null=True, blank=True)
+    failed_at = models.DateTimeField(null=True, blank=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["delivered_at", "next_attempt_at"]),
+        ]
+
+    def __str__(self):
+        return f"Webhook {self.id} for request {self.service_request_id}"
+
+
+class StatusRollup(models.Model):
+    """
+    Counts of request lifecycle events per hour or day, service type and
+    support staff member, kept current by service_requests.rollups as
+    statuses change so analytics never scan ServiceRequest rows. Rows are
+    spread over the shards; totals are summed across them.
+    """
+
+    PERIODS = [
+        ("hour", "Hour"),
+        ("day", "Day"),
+    ]
+
+    period = models.CharField(max_length=4, choices=PERIODS)
+    bucket = models.DateTimeField()
+    service_type = models.CharField(max_length=20, choices=ServiceRequest.SERVICE_TYPES)
+    # 0 stands for unassigned so the unique constraint also covers those rows.
+    support_staff_id = models.BigIntegerField(default=0)
+    created = models.PositiveIntegerField(default=0)
+    resolved = models.PositiveIntegerField(default=0)
+    reopened = models.PositiveIntegerField(default=0)
+    deleted = models.PositiveIntegerField(default=0)
+    # Open requests moved to or away from this staff member, e.g. by a claim.
+    reassigned_in = models.PositiveIntegerField(default=0)
+    reassigned_out = models.PositiveIntegerField(default=0)
+    resolution_seconds = models.FloatField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["period", "bucket", "service_type", "support_staff_id"],
+                name="unique_status_rollup_bucket",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.period} {self.bucket} {self.service_type} {self.support_staff_id}"
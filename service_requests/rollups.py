@@ -0,0 +1,123 @@
+import functools
+import operator
+from datetime import timedelta, timezone as dt_timezone
+
+from django.db.models import F, Q, Sum
+
+from .models import StatusRollup
+from .sharding import fan_out
+
+PERIODS = [period for period, _ in StatusRollup.PERIODS]
+COUNTERS = ("created", "resolved", "reopened", "deleted", "reassigned_in", "reassigned_out", "resolution_seconds")
+
+
+def bucket_start(moment, period):
+    """Start of the UTC hour or day containing moment."""
+    moment = moment.astimezone(dt_timezone.utc).replace(minute=0, second=0, microsecond=0)
+    if period == "day":
+        moment = moment.replace(hour=0)
+    return moment
+
+
+def _keys(moment, service_type, support_staff_id):
+    return [
+        {"period": period, "bucket": bucket_start(moment, period), "service_type": service_type,
+         "support_staff_id": support_staff_id or 0}
+        for period in PERIODS
+    ]
+
+
+def _increment(moment, service_type, increments_by_staff):
+    """
+    Adds increments to the hour and day rollups containing moment, for each
+    support staff id given. Missing rows are created first, skipping any
+    that already exist, so no savepoint is needed however many requests race
+    for them: one INSERT, then one UPDATE per staff member.
+    """
+    keys = {staff_id: _keys(moment, service_type, staff_id) for staff_id in increments_by_staff}
+    StatusRollup.objects.bulk_create(
+        [StatusRollup(**key) for staff_keys in keys.values() for key in staff_keys], ignore_conflicts=True
+    )
+    for staff_id, increments in increments_by_staff.items():
+        StatusRollup.objects.filter(functools.reduce(operator.or_, (Q(**key) for key in keys[staff_id]))).update(
+            **{field: F(field) + value for field, value in increments.items()}
+        )
+
+
+def record_created(service_request):
+    _increment(
+        service_request.created_at, service_request.service_type, {service_request.support_staff_id: {"created": 1}}
+    )
+
+
+def record_status_change(created_at, service_type, support_staff_id, old_status, new_status, changed_at):
+    """Counts a resolution (with its time to resolve) or a reopening; other transitions leave rollups alone."""
+    if new_status == old_status:
+        return
+    if new_status == "resolved":
+        increments = {"resolved": 1, "resolution_seconds": (changed_at - created_at).total_seconds()}
+    elif old_status == "resolved":
+        increments = {"reopened": 1}
+    else:
+        return
+    _increment(changed_at, service_type, {support_staff_id: increments})
+
+
+def record_deleted(service_request, deleted_at):
+    _increment(deleted_at, service_request.service_type, {service_request.support_staff_id: {"deleted": 1}})
+
+
+def record_reassigned(service_type, old_staff_id, new_staff_id, changed_at):
+    """Moves an open request from one staff member's backlog to another's, e.g. when it is claimed."""
+    if (old_staff_id or 0) == (new_staff_id or 0):
+        return
+    _increment(changed_at, service_type, {old_staff_id: {"reassigned_out": 1}, new_staff_id: {"reassigned_in": 1}})
+
+
+def open_change(counters):
+    """How much the given counters moved the number of open requests."""
+    return (
+        counters["created"] - counters["resolved"] + counters["reopened"] - counters["deleted"]
+        + counters["reassigned_in"] - counters["reassigned_out"]
+    )
+
+
+def bucket_range(start, end, period):
+    """Bucket starts from the one containing start up to, excluding, end."""
+    step = timedelta(hours=1) if period == "hour" else timedelta(days=1)
+    bucket = bucket_start(start, period)
+    while bucket < end:
+        yield bucket
+        bucket += step
+
+
+def summarize(period, start, end, **filters):
+    """
+    Totals per bucket of the given period between start and end, plus the
+    backlog of open requests when start was reached, summed over every shard.
+
+    The backlog adds up all earlier activity from day rollups, topped up with
+    the hour rollups of the day start falls in, so it stays cheap however far
+    back history goes.
+    """
+    start = bucket_start(start, period)
+    day_of_start = bucket_start(start, "day")
+    rollups = StatusRollup.objects.filter(**filters)
+    sums = {field: Sum(field) for field in COUNTERS}
+
+    def collect():
+        buckets = rollups.filter(period=period, bucket__gte=start, bucket__lt=end).values("bucket").annotate(**sums)
+        before = rollups.filter(
+            Q(period="day", bucket__lt=day_of_start) | Q(period="hour", bucket__gte=day_of_start, bucket__lt=start)
+        )
+        return list(buckets.order_by("bucket")), before.aggregate(**sums)
+
+    totals = {}
+    backlog = 0
+    for buckets, before in fan_out(collect):
+        for row in buckets:
+            counters = totals.setdefault(row.pop("bucket"), dict.fromkeys(COUNTERS, 0))
+            for field in COUNTERS:
+                counters[field] += row[field]
+        backlog += open_change({field: value or 0 for field, value in before.items()})
+    return totals, backlog
@@ -1,8 +1,12 @@
 from rest_framework import serializers
 from .models import ServiceRequest
+from . import rollups
+from attachments.content_store import store_file
 from attachments.models import Attachment
 import random
+import time
 from django.contrib.auth import get_user_model
+from gasutility.metrics import STAFF_ASSIGNMENT_SECONDS, UPLOAD_BYTES
 
 User = get_user_model()
 
@@ -46,12 +50,16 @@ class ServiceRequestSerializer(serializers.ModelSerializer):
         files = validated_data.pop('attachments', [])
         validated_data["customer"] = request.user
 
-        support_staff = User.objects.filter(role="support_staff")
-        validated_data["support_staff"] = random.choice(support_staff) if support_staff.exists() else None
+        assignment_started = time.perf_counter()
+        support_staff_ids = list(User.objects.filter(role="support_staff").values_list("id", flat=True))
+        validated_data["support_staff_id"] = random.choice(support_staff_ids) if support_staff_ids else None
+        STAFF_ASSIGNMENT_SECONDS.observe(time.perf_counter() - assignment_started)
 
         service_request = ServiceRequest.objects.create(**validated_data)
+        rollups.record_created(service_request)
 
         for file in files:
-            Attachment.objects.create(file=file, service_request=service_request)
+            Attachment.objects.create(service_request=service_request, **store_file(file))
+            UPLOAD_BYTES.inc(file.size)
 
         return service_request
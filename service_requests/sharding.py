@@ -0,0 +1,241 @@
+import functools
+import heapq
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar, copy_context
+from itertools import islice
+
+from django.conf import settings
+from django.db import IntegrityError, connections, transaction
+from django.db.models import F
+
+SHARD_PREFIX = "shard_"
+
+# Models whose rows live on the shard of the customer that owns them. Users
+# and everything else stay on the default database.
+SHARDED_MODELS = frozenset({
+    "service_requests.servicerequest",
+    "service_requests.servicerequesttombstone",
+    "service_requests.webhookoutbox",
+    "service_requests.statusrollup",
+    "attachments.attachment",
+})
+
+_current_shard = ContextVar("current_shard", default=None)
+
+
+def shard_aliases():
+    """Shard database aliases in index order, or an empty list when sharding is off."""
+    aliases = [alias for alias in settings.DATABASES if alias.startswith(SHARD_PREFIX)]
+    return sorted(aliases, key=lambda alias: int(alias[len(SHARD_PREFIX):]))
+
+
+def all_shards():
+    """Every database holding sharded rows: the shards, or just the default database."""
+    return shard_aliases() or ["default"]
+
+
+def is_sharded(model):
+    return model._meta.label_lower in SHARDED_MODELS
+
+
+def shard_for_customer(customer_id):
+    aliases = shard_aliases()
+    if not aliases:
+        return "default"
+    return aliases[zlib.crc32(str(customer_id).encode()) % len(aliases)]
+
+
+def shard_for_id(object_id):
+    """
+    Shard holding the service request or attachment with this id. Ids are
+    allocated so that id % number of shards is the index of their shard.
+    """
+    aliases = shard_aliases()
+    if not aliases:
+        return "default"
+    return aliases[object_id % len(aliases)]
+
+
+def group_by_shard(object_ids):
+    """Maps each shard alias to the ids it holds, keeping the given order."""
+    groups = {}
+    for object_id in object_ids:
+        groups.setdefault(shard_for_id(object_id), []).append(object_id)
+    return groups
+
+
+def current_shard():
+    """Alias selected with use_shard(), or "default" when sharding is off."""
+    alias = _current_shard.get()
+    if alias is None and shard_aliases():
+        raise RuntimeError("No shard selected; wrap sharded queries in use_shard().")
+    return alias or "default"
+
+
+@contextmanager
+def use_shard(alias):
+    """Routes queries on sharded models to alias for the duration of the block."""
+    token = _current_shard.set(alias)
+    try:
+        yield alias
+    finally:
+        _current_shard.reset(token)
+
+
+def on_shard_of(argument):
+    """View decorator selecting the shard that holds the object whose id is the URL argument."""
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            with use_shard(shard_for_id(kwargs[argument])):
+                return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _run_on_shard(context, wrappers, alias, function):
+    def run():
+        # Connections are per thread, so execute wrappers installed by the
+        # caller (query metrics, for one) are carried over explicitly.
+        with ExitStack() as stack:
+            for wrapper_alias, alias_wrappers in wrappers.items():
+                for wrapper in alias_wrappers:
+                    stack.enter_context(connections[wrapper_alias].execute_wrapper(wrapper))
+            with use_shard(alias):
+                return function()
+
+    try:
+        return context.run(run)
+    finally:
+        connections.close_all()
+
+
+def fan_out(function, aliases=None):
+    """
+    Calls function once per shard with that shard selected and returns the
+    results in shard order. Several shards are queried in parallel threads,
+    each using the caller's execute wrappers and closing its own connections
+    when done.
+    """
+    aliases = all_shards() if aliases is None else list(aliases)
+    if len(aliases) == 1:
+        with use_shard(aliases[0]):
+            return [function()]
+    with ThreadPoolExecutor(max_workers=min(settings.SHARD_FAN_OUT_WORKERS, len(aliases))) as executor:
+        wrappers = {alias: list(connections[alias].execute_wrappers) for alias in connections}
+        futures = [executor.submit(_run_on_shard, copy_context(), wrappers, alias, function) for alias in aliases]
+        return [future.result() for future in futures]
+
+
+class MergedRows:
+    """
+    Sequence view of the same values() queryset run on every shard, merged by
+    key. Supports what pagination needs: count() and slicing. A slice fetches
+    at most its stop index of rows from each shard.
+    """
+
+    def __init__(self, queryset, key, ordering):
+        self.queryset = queryset.order_by(*ordering)
+        self.key = key
+
+    def count(self):
+        return sum(fan_out(self.queryset.count))
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice) or index.step not in (None, 1) or index.stop is None:
+            raise TypeError("MergedRows only supports bounded slices.")
+        start, stop = index.start or 0, index.stop
+        per_shard = fan_out(lambda: list(self.queryset[:stop]))
+        return list(islice(heapq.merge(*per_shard, key=self.key), start, stop))
+
+
+class IdAllocator:
+    """
+    Hands out primary keys for sharded rows so that id % number of shards is
+    the shard index, letting any later lookup by id find the right shard.
+
+    Each (model, shard) pair has a counter n on the default database, giving
+    ids n * shards + index. Counters are reserved in blocks of
+    SHARD_ID_BLOCK_SIZE per worker process to keep the default database off
+    the insert path.
+    """
+
+    def __init__(self):
+        self._blocks = {}
+        self._lock = threading.Lock()
+
+    def allocate(self, model, alias):
+        aliases = shard_aliases()
+        name = f"{model._meta.label_lower}:{alias}"
+        with self._lock:
+            next_value, end = self._blocks.get(name, (0, 0))
+            if next_value >= end:
+                next_value, end = self._reserve(name, settings.SHARD_ID_BLOCK_SIZE)
+            self._blocks[name] = (next_value + 1, end)
+        return next_value * len(aliases) + aliases.index(alias)
+
+    def _reserve(self, name, size):
+        from .models import IdBlock
+
+        blocks = IdBlock.objects.using("default")
+        while True:
+            with transaction.atomic(using="default"):
+                if blocks.filter(name=name).update(next_value=F("next_value") + size):
+                    end = blocks.filter(name=name).values_list("next_value", flat=True).get()
+                    return end - size, end
+                try:
+                    # Counter 0 would give index-only ids, so shards start at 1.
+                    with transaction.atomic(using="default"):
+                        blocks.create(name=name, next_value=1 + size)
+                    return 1, 1 + size
+                except IntegrityError:
+                    continue
+
+
+ID_ALLOCATOR = IdAllocator()
+
+
+def assign_id(instance):
+    """Gives a new sharded row an id on the selected shard; autoincrement is used when sharding is off."""
+    if instance.pk is None and shard_aliases():
+        instance.pk = ID_ALLOCATOR.allocate(type(instance), current_shard())
+
+
+class ShardRouter:
+    """
+    Sends sharded models to the shard selected with use_shard() (or the one a
+    related instance was loaded from) and keeps them off other databases.
+    Everything else falls through to the next router.
+    """
+
+    def _db_for_model(self, model, **hints):
+        if not is_sharded(model) or not shard_aliases():
+            return None
+        alias = _current_shard.get()
+        if alias is None:
+            instance = hints.get("instance")
+            if instance is not None and instance._state.db:
+                return instance._state.db
+        return current_shard()
+
+    db_for_read = _db_for_model
+    db_for_write = _db_for_model
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        aliases = shard_aliases()
+        if not aliases or model_name is None:
+            return None
+        if f"{app_label}.{model_name}" in SHARDED_MODELS:
+            return db in aliases
+        if db in aliases:
+            return False
+        return None
@@ -0,0 +1,94 @@
+import unittest
+from datetime import datetime, timezone as dt_timezone
+
+from django.test import TestCase
+from rest_framework.renderers import JSONRenderer
+
+from accounts.models import User
+from attachments.models import Attachment
+from service_requests.fast_serializers import (
+    RESPONSE_FIELDS, parse_fields, serialize_service_request_rows, service_request_rows,
+)
+from service_requests.models import ServiceRequest
+from service_requests.serializers import ServiceRequestSerializer
+from service_requests.sharding import shard_aliases
+
+
+@unittest.skipIf(shard_aliases(), "Fixtures are created on the default database.")
+class FastSerializerTests(TestCase):
+    """The values()-based read path must render exactly what ServiceRequestSerializer does."""
+
+    @classmethod
+    def setUpTestData(cls):
+        customer = User.objects.create_user("kunde@example.com", "Secret-123")
+        staff = User.objects.create_user("staff@example.com", "Secret-123", role="support_staff")
+
+        cls.with_attachments = ServiceRequest.objects.create(
+            customer=customer,
+            support_staff=staff,
+            title="Gaszähler defekt – 東京",
+            description="Der Zähler im Keller läuft rückwärts 🔥 \"quoted\" \\ backslash\nnew line",
+            service_type="repair",
+        )
+        Attachment.objects.create(
+            service_request=cls.with_attachments,
+            file="attachments/uploads/9f/" + "9f" * 32 + ".jpg",
+            original_name="meter.jpg",
+            sha256="9f" * 32,
+            size=1024,
+            content_type="image/jpeg",
+        )
+        # Attachments stored before content hashing kept the uploaded name
+        # and have no recorded metadata.
+        Attachment.objects.create(service_request=cls.with_attachments, file="attachments/uploads/Zähler Foto (1).jpeg")
+        Attachment.objects.create(service_request=cls.with_attachments, file="attachments/uploads/scan%20form.pdf")
+
+        cls.without_attachments = ServiceRequest.objects.create(
+            customer=customer,
+            support_staff=staff,
+            title="Pilot light out",
+            description="No attachments on this one",
+            service_type="maintenance",
+        )
+        cls.unassigned = ServiceRequest.objects.create(
+            customer=customer,
+            title="New installation",
+            description="Unassigned and never updated",
+            service_type="installation",
+        )
+        ServiceRequest.objects.filter(id=cls.unassigned.id).update(support_staff=None)
+        ServiceRequest.objects.filter(id=cls.without_attachments.id).update(
+            updated_at=datetime(2024, 2, 29, 23, 59, 59, 123456, tzinfo=dt_timezone.utc)
+        )
+
+    def render(self, data):
+        return JSONRenderer().render(data)
+
+    def assertSameJSON(self, queryset):
+        expected = ServiceRequestSerializer(queryset, many=True).data
+        actual = serialize_service_request_rows(service_request_rows(queryset))
+        self.assertEqual(self.render(actual), self.render(expected))
+
+    def test_matches_serializer_for_all_fixtures(self):
+        self.assertSameJSON(ServiceRequest.objects.order_by("id"))
+
+    def test_matches_serializer_for_unicode_and_legacy_file_names(self):
+        self.assertSameJSON(ServiceRequest.objects.filter(id=self.with_attachments.id))
+
+    def test_matches_serializer_without_attachments(self):
+        queryset = ServiceRequest.objects.filter(id__in=[self.without_attachments.id, self.unassigned.id]).order_by("id")
+        self.assertSameJSON(queryset)
+        self.assertEqual(serialize_service_request_rows(service_request_rows(queryset))[0]["uploaded_attachments"], [])
+
+    def test_sparse_fields_are_a_subset_of_the_full_response(self):
+        queryset = ServiceRequest.objects.order_by("id")
+        full = ServiceRequestSerializer(queryset, many=True).data
+        for value in ("id,title", "uploaded_attachments,status", ",".join(RESPONSE_FIELDS)):
+            fields = parse_fields(value)
+            sparse = serialize_service_request_rows(service_request_rows(queryset, fields=fields), fields=fields)
+            expected = [{name: row[name] for name in fields} for row in full]
+            self.assertEqual(self.render(sparse), self.render(expected))
+
+    def test_unknown_field_is_rejected(self):
+        with self.assertRaises(ValueError):
+            parse_fields("id,password")
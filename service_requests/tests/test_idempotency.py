@@ -0,0 +1,92 @@
+import tempfile
+import unittest
+from datetime import timedelta
+from unittest import mock
+
+from django.db import DatabaseError
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from service_requests.models import IdempotencyKey, ServiceRequest
+from service_requests.sharding import shard_aliases
+
+CREATE_URL = "/api/service-request/create/"
+
+
+@unittest.skipIf(shard_aliases(), "Fixtures are created on the default database.")
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(), IDEMPOTENCY_LEASE_SECONDS=120)
+class IdempotencyKeyTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = User.objects.create_user("customer@example.com", "Secret-123")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.customer)
+
+    def create(self, key, title="Gas smell in kitchen"):
+        return self.client.post(CREATE_URL, {
+            "title": title,
+            "description": "Strong smell near the stove since morning",
+            "service_type": "repair",
+        }, format="multipart", HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_retry_replays_the_stored_response(self):
+        first = self.create("retry-1")
+        retry = self.create("retry-1")
+
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(retry.status_code, 201)
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertEqual(retry.json(), first.json())
+        self.assertEqual(ServiceRequest.objects.count(), 1)
+
+    def test_validation_errors_are_replayed_too(self):
+        first = self.create("invalid-1", title="Gas")
+        retry = self.create("invalid-1", title="Gas")
+
+        self.assertEqual(first.status_code, 400)
+        self.assertEqual(retry.status_code, 400)
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+
+    def test_key_reused_for_another_request_is_rejected(self):
+        self.create("reused-1")
+
+        response = self.create("reused-1", title="Another request")
+
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(ServiceRequest.objects.count(), 1)
+
+    def test_retry_while_the_first_attempt_runs_conflicts(self):
+        first = self.create("pending-1")
+        IdempotencyKey.objects.filter(key="pending-1").update(status_code=None, response_body=None)
+
+        response = self.create("pending-1")
+
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(response.status_code, 409)
+
+    def test_retry_takes_over_a_key_whose_worker_died(self):
+        self.create("abandoned-1")
+        # As left by a worker killed before it stored the response.
+        ServiceRequest.objects.all().delete()
+        IdempotencyKey.objects.filter(key="abandoned-1").update(
+            status_code=None, response_body=None, created_at=timezone.now() - timedelta(seconds=121),
+        )
+
+        response = self.create("abandoned-1")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertNotIn("Idempotent-Replayed", response)
+        self.assertEqual(ServiceRequest.objects.count(), 1)
+        self.assertEqual(self.create("abandoned-1")["Idempotent-Replayed"], "true")
+
+    def test_request_is_not_kept_without_its_stored_response(self):
+        with mock.patch("service_requests.idempotency.store_response", side_effect=DatabaseError("disk full")):
+            with self.assertRaises(DatabaseError):
+                self.create("unstored-1")
+
+        self.assertFalse(ServiceRequest.objects.exists())
+        self.assertFalse(IdempotencyKey.objects.filter(key="unstored-1").exists())
@@ -0,0 +1,52 @@
+import unittest
+import warnings
+from datetime import timedelta
+
+from django.core.paginator import UnorderedObjectListWarning
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from service_requests.models import ArchivedServiceRequest, ServiceRequest
+from service_requests.sharding import shard_aliases
+
+LIST_URL = "/api/service-request/getAll/"
+
+
+@unittest.skipIf(shard_aliases(), "Fixtures are created on the default database.")
+class ListRequestsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = User.objects.create_user("customer@example.com", "Secret-123")
+        now = timezone.now()
+        # Created out of id order, so only an explicit ordering lists them by age.
+        cls.ids = []
+        for hours in (1, 3, 2):
+            service_request = ServiceRequest.objects.create(
+                customer=cls.customer, title="Meter reading", description="Reading looks wrong",
+            )
+            ServiceRequest.objects.filter(id=service_request.id).update(created_at=now - timedelta(hours=hours))
+            ArchivedServiceRequest.objects.create(
+                id=service_request.id, customer=cls.customer, title="Meter reading", description="Reading looks wrong",
+                status="resolved", service_type="repair", created_at=now - timedelta(hours=hours), updated_at=now,
+            )
+            cls.ids.append(service_request.id)
+        cls.oldest_first = [cls.ids[1], cls.ids[2], cls.ids[0]]
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.customer)
+
+    def list_ids(self, params):
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", UnorderedObjectListWarning)
+            response = self.client.get(LIST_URL, params)
+        self.assertEqual(response.status_code, 200)
+        return [row["id"] for row in response.json()["results"]]
+
+    def test_lists_current_requests_oldest_first(self):
+        self.assertEqual(self.list_ids({}), self.oldest_first)
+
+    def test_lists_archived_requests_oldest_first(self):
+        self.assertEqual(self.list_ids({"archived": "true"}), self.oldest_first)
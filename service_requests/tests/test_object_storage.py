@@ -0,0 +1,17 @@
+from urllib.parse import parse_qs, urlsplit
+
+from django.test import SimpleTestCase, override_settings
+
+from attachments.storage import ObjectStorage
+
+
+class ObjectStorageTests(SimpleTestCase):
+    def setUp(self):
+        self.storage = ObjectStorage("https://objects.example.com", "attachments", "access", "secret")
+
+    @override_settings(SIGNED_DOWNLOADS={"SECRET": "", "EXPIRES_SECONDS": 300, "BASE_URL": ""})
+    def test_url_expires_with_signed_downloads(self):
+        url = urlsplit(self.storage.url("service_requests/meter.jpeg"))
+
+        self.assertEqual(url.path, "/attachments/service_requests/meter.jpeg")
+        self.assertEqual(parse_qs(url.query)["X-Amz-Expires"], ["300"])
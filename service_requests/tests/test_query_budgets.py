@@ -0,0 +1,382 @@
+"""
+Query budgets and plans of every endpoint.
+
+Each test runs one request and fails if it runs a different number of queries
+than its budget, or if the plan of any of them scans a whole table. Update the
+budget together with the change that legitimately alters it.
+
+ShardedQueryBudgetTests only run with three shards configured, e.g.
+DATABASE_SHARDS=shard0.sqlite3,shard1.sqlite3,shard2.sqlite3 python manage.py test
+(test databases are created in memory, the files are never touched).
+"""
+import io
+import re
+import tempfile
+import threading
+import unittest
+from contextlib import ExitStack, contextmanager
+from datetime import timedelta
+from unittest import mock
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connections
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.models import User
+from accounts.revocation import REVOKED_TOKENS
+from attachments import signing
+from attachments.models import Attachment
+from service_requests.models import ServiceRequest
+from service_requests.sharding import IdAllocator, shard_aliases, shard_for_customer, use_shard
+
+EXPECTED_QUERIES = {
+    "register_user": 2,
+    "login_user": 1,
+    "get_user_profile": 1,
+    "create_service_request": 9,
+    "list_requests (customer)": 4,
+    "list_requests (staff)": 4,
+    "list_requests (archived)": 2,
+    "list_requests (sparse)": 3,
+    "get_service_request": 3,
+    "batch_get_service_requests": 3,
+    "sync_requests": 4,
+    "claim_service_request": 12,
+    "update_service_request_status": 8,
+    "delete_service_request": 15,
+    "download_file": 2,
+    "download_file (head)": 2,
+    "download_link": 2,
+    "signed_file": 0,
+    "service_request_analytics": 3,
+}
+
+# With three shards, counting the queries on every database including those
+# fan_out runs in worker threads. Top-level transactions show up as one BEGIN
+# where the unsharded tests see a SAVEPOINT and its RELEASE.
+EXPECTED_SHARDED_QUERIES = {
+    **EXPECTED_QUERIES,
+    "create_service_request": 8,
+    "list_requests (staff)": 10,
+    "batch_get_service_requests": 7,
+    "claim_service_request": 14,
+    "update_service_request_status": 7,
+    "delete_service_request": 18,
+    "service_request_analytics": 7,
+}
+
+# Full scans that are expected, as (budget name, table) pairs.
+ALLOWED_SCANS = set()
+
+PLANNED_STATEMENT = re.compile(r"^\s*(SELECT|UPDATE|DELETE)\b", re.IGNORECASE)
+FULL_SCAN = re.compile(r"^SCAN (\w+)$")
+
+PASSWORD = "Secret-123"
+JPEG = b"\xff\xd8\xff\xe0" + b"\x00" * 64
+BASE = "/api/service-request"
+
+
+# Webhooks are enabled so status changes include their outbox insert.
+budget_settings = override_settings(
+    MEDIA_ROOT=tempfile.mkdtemp(),
+    PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"],
+    TOKEN_REVOCATION_REFRESH_SECONDS=3600,
+    WEBHOOKS={**settings.WEBHOOKS, "URL": "http://127.0.0.1:8765/"},
+)
+
+
+class AllDatabaseQueries:
+    """
+    Execute wrapper recording the queries run on any database, in the shape
+    of CaptureQueriesContext.captured_queries plus the alias and parameters.
+    """
+
+    def __init__(self):
+        self.captured_queries = []
+        self._lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        with self._lock:
+            self.captured_queries.append({
+                "alias": context["connection"].alias,
+                "sql": sql,
+                "params": None if many else params,
+            })
+        return execute(sql, params, many, context)
+
+
+class QueryBudgetChecks:
+    """Tests shared by the unsharded and the sharded case; subclasses seed the data."""
+
+    expected_queries = EXPECTED_QUERIES
+
+    @classmethod
+    def create_fixtures(cls, target):
+        """Creates the users and requests the endpoints are called with and sets them on target."""
+        target.staff = User.objects.create_user("budget-staff@example.com", PASSWORD, role="support_staff")
+        target.customer = User.objects.create_user("budget-customer@example.com", PASSWORD)
+        target.admin = User.objects.create_user("budget-admin@example.com", PASSWORD, role="admin")
+        target.route_ids = []
+        for index in range(4):
+            customer = target.customer if index == 0 else User.objects.create_user(
+                f"budget-customer-{index}@example.com", PASSWORD
+            )
+            with use_shard(shard_for_customer(customer.id)):
+                for _ in range(3):
+                    target.route_ids.append(ServiceRequest.objects.create(
+                        customer=customer, support_staff=target.staff, status="in_progress",
+                        title="Meter reading", description="Reading looks wrong",
+                    ).id)
+
+        with use_shard(shard_for_customer(target.customer.id)):
+            target.request = ServiceRequest.objects.create(
+                customer=target.customer, support_staff=target.staff, status="in_progress",
+                title="Gas smell", description="Smell near the boiler",
+            )
+            target.attachment = Attachment.objects.create(
+                service_request=target.request, file=SimpleUploadedFile("meter.jpeg", JPEG),
+            )
+            target.pending = ServiceRequest.objects.create(
+                customer=target.customer, title="Pending job", description="Waiting for a visit",
+            )
+            Attachment.objects.create(service_request=target.pending, file=SimpleUploadedFile("meter.jpeg", JPEG))
+
+        since = (timezone.now() - timedelta(days=731)).date().isoformat()
+        call_command("backfill_rollups", since=since, window_days=30, stdout=io.StringIO())
+
+    def setUp(self):
+        super().setUp()
+        # The revocation list refreshes on a timer; load it up front so its
+        # refresh query does not land in a budget.
+        REVOKED_TOKENS.refresh()
+
+    def client_for(self, user=None):
+        client = APIClient()
+        if user is not None:
+            client.credentials(HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(user).access_token}")
+        return client
+
+    @contextmanager
+    def capture_queries(self, name):
+        # Callbacks deferred to the commit, such as releasing stored files,
+        # run here since the test transaction never commits.
+        with self.assertNumQueries(self.expected_queries[name]) as context, \
+                self.captureOnCommitCallbacks(execute=True):
+            yield context
+
+    @contextmanager
+    def assertQueryBudget(self, name):
+        with self.capture_queries(name) as context:
+            yield
+        for query in context.captured_queries:
+            alias = query.get("alias", "default")
+            for table in (match.group(1) for match in map(FULL_SCAN.match, self.query_plan(query)) if match):
+                if (name, table) not in ALLOWED_SCANS:
+                    self.fail(f"{name}: full scan of {table} on {alias} in {query['sql']}")
+
+    def query_plan(self, query):
+        # Plans are only checked on SQLite, the database used in CI.
+        connection = connections[query.get("alias", "default")]
+        if connection.vendor != "sqlite" or not PLANNED_STATEMENT.match(query["sql"]):
+            return []
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {query['sql']}", query.get("params"))
+            return [row[-1] for row in cursor.fetchall()]
+
+    def assertSuccess(self, response):
+        self.assertLess(response.status_code, 400, getattr(response, "data", None))
+
+    def test_register_user(self):
+        with self.assertQueryBudget("register_user"):
+            response = self.client_for().post(
+                "/api/auth/register/", {"email": "new-customer@example.com", "password": PASSWORD}, format="json"
+            )
+        self.assertSuccess(response)
+
+    def test_login_user(self):
+        client = self.client_for()
+        with self.assertQueryBudget("login_user"):
+            response = client.post(
+                "/api/auth/login/", {"email": self.customer.email, "password": PASSWORD}, format="json"
+            )
+        self.assertSuccess(response)
+
+    def test_get_user_profile(self):
+        client = self.client_for(self.customer)
+        with self.assertQueryBudget("get_user_profile"):
+            response = client.get("/api/profile/")
+        self.assertSuccess(response)
+
+    def test_create_service_request(self):
+        client = self.client_for(self.customer)
+        with self.assertQueryBudget("create_service_request"):
+            response = client.post(f"{BASE}/create/", {
+                "title": "Gas smell in kitchen",
+                "description": "Strong smell near the stove since morning",
+                "service_type": "repair",
+                "attachments": [SimpleUploadedFile("meter.jpeg", JPEG)],
+            }, format="multipart")
+        self.assertSuccess(response)
+
+    def test_list_requests_customer(self):
+        client = self.client_for(self.customer)
+        with self.assertQueryBudget("list_requests (customer)"):
+            response = client.get(f"{BASE}/getAll/", {"page_size": 100})
+        self.assertSuccess(response)
+
+    def test_list_requests_staff(self):
+        client = self.client_for(self.staff)
+        with self.assertQueryBudget("list_requests (staff)"):
+            response = client.get(f"{BASE}/getAll/", {"page_size": 100})
+        self.assertSuccess(response)
+
+    def test_list_requests_sparse(self):
+        client = self.client_for(self.customer)
+        with self.assertQueryBudget("list_requests (sparse)"):
+            response = client.get(f"{BASE}/getAll/", {"page_size": 100, "fields": "id,title,status,updated_at"})
+        self.assertSuccess(response)
+
+    def test_list_requests_archived(self):
+        client = self.client_for(self.customer)
+        with self.assertQueryBudget("list_requests (archived)"):
+            response = client.get(f"{BASE}/getAll/", {"archived": "true"})
+        self.assertSuccess(response)
+
+    def test_get_service_request(self):
+        client = self.client_for(self.customer)
+        with self.assertQueryBudget("get_service_request"):
+            response = client.get(f"{BASE}/{self.request.id}/")
+        self.assertSuccess(response)
+
+    def test_batch_get_service_requests(self):
+        client = self.client_for(self.staff)
+        with self.assertQueryBudget("batch_get_service_requests"):
+            response = client.get(f"{BASE}/batch/", {"ids": ",".join(map(str, self.route_ids))})
+        self.assertSuccess(response)
+        self.assertEqual(len(response.data["results"]), len(self.route_ids))
+
+    def test_sync_requests(self):
+        client = self.client_for(self.customer)
+        updated_since = (timezone.now() - timedelta(days=1)).isoformat()
+        with self.assertQueryBudget("sync_requests"):
+            response = client.get(f"{BASE}/sync/", {"updated_since": updated_since})
+        self.assertSuccess(response)
+
+    def test_claim_service_request(self):
+        client = self.client_for(self.staff)
+        with self.assertQueryBudget("claim_service_request"):
+            response = client.post(f"{BASE}/claim/")
+        self.assertEqual(response.status_code, 200)
+
+    def test_update_service_request_status(self):
+        client = self.client_for(self.staff)
+        with self.assertQueryBudget("update_service_request_status"):
+            response = client.patch(f"{BASE}/update/{self.request.id}/", {"status": "resolved"}, format="json")
+        self.assertSuccess(response)
+
+    def test_delete_service_request(self):
+        client = self.client_for(self.customer)
+        with self.assertQueryBudget("delete_service_request"):
+            response = client.delete(f"{BASE}/delete/{self.pending.id}/")
+        self.assertEqual(response.status_code, 204)
+
+    def test_download_file(self):
+        client = self.client_for(self.customer)
+        with self.assertQueryBudget("download_file"):
+            response = client.get(f"{BASE}/download/{self.attachment.id}/")
+        self.assertSuccess(response)
+
+    def test_download_file_head(self):
+        client = self.client_for(self.customer)
+        with self.assertQueryBudget("download_file (head)"):
+            response = client.head(f"{BASE}/download/{self.attachment.id}/")
+        self.assertSuccess(response)
+
+    def test_download_link(self):
+        client = self.client_for(self.customer)
+        with self.assertQueryBudget("download_link"):
+            response = client.get(f"{BASE}/download/{self.attachment.id}/link/")
+        self.assertSuccess(response)
+
+    def test_signed_file(self):
+        url, _ = signing.download_url(self.attachment.file.name, "meter.jpeg", "image/jpeg")
+        client = self.client_for()
+        with self.assertQueryBudget("signed_file"):
+            response = client.get(url)
+        self.assertSuccess(response)
+
+    def test_service_request_analytics(self):
+        client = self.client_for(self.admin)
+        with self.assertQueryBudget("service_request_analytics"):
+            response = client.get(f"{BASE}/analytics/", {"period": "hour"})
+        self.assertSuccess(response)
+
+
+@unittest.skipIf(shard_aliases(), "Requests live on the shards; see ShardedQueryBudgetTests.")
+@budget_settings
+class QueryBudgetTests(QueryBudgetChecks, TestCase):
+    """Budgets on the default database over a generated dataset."""
+
+    @classmethod
+    def setUpTestData(cls):
+        call_command(
+            "generate_dataset", customers=200, staff=20, requests=1000, attachments_per_request=1,
+            stdout=io.StringIO(),
+        )
+        cls.create_fixtures(cls)
+
+
+@unittest.skipUnless(len(shard_aliases()) == 3, "DATABASE_SHARDS does not list three shards.")
+@budget_settings
+class ShardedQueryBudgetTests(QueryBudgetChecks, TransactionTestCase):
+    """
+    Budgets with the requests spread over the shards. fan_out runs queries in
+    worker threads, which only see committed rows, hence TransactionTestCase.
+    """
+
+    databases = "__all__"
+    reset_sequences = True
+    expected_queries = EXPECTED_SHARDED_QUERIES
+
+    def setUp(self):
+        super().setUp()
+        # Id blocks reserved by earlier tests would change which create has
+        # to reserve a new one.
+        allocator = mock.patch("service_requests.sharding.ID_ALLOCATOR", IdAllocator())
+        allocator.start()
+        self.addCleanup(allocator.stop)
+
+        staff = [
+            User.objects.create_user(f"seed-staff-{index}@example.com", PASSWORD, role="support_staff")
+            for index in range(3)
+        ]
+        for index in range(12):
+            customer = User.objects.create_user(f"seed-customer-{index}@example.com", PASSWORD)
+            with use_shard(shard_for_customer(customer.id)):
+                for status in ("pending", "in_progress", "resolved"):
+                    request = ServiceRequest.objects.create(
+                        customer=customer, support_staff=staff[index % len(staff)], status=status,
+                        title="Seeded request", description="Generated for the query budgets",
+                    )
+                    Attachment.objects.create(
+                        service_request=request, file=f"attachments/uploads/seed/{request.id}.jpeg",
+                    )
+        self.create_fixtures(self)
+
+    @contextmanager
+    def capture_queries(self, name):
+        queries = AllDatabaseQueries()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(queries))
+            yield queries
+        executed = "\n".join(f"{query['alias']}: {query['sql']}" for query in queries.captured_queries)
+        self.assertEqual(
+            len(queries.captured_queries), self.expected_queries[name],
+            f"{len(queries.captured_queries)} queries executed, {self.expected_queries[name]} expected\n{executed}",
+        )
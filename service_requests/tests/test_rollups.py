@@ -0,0 +1,56 @@
+import io
+import unittest
+from datetime import timedelta
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from accounts.models import User
+from service_requests.models import ServiceRequest, StatusRollup
+from service_requests.rollups import bucket_start
+from service_requests.sharding import shard_aliases
+
+
+@unittest.skipIf(shard_aliases(), "Fixtures are created on the default database.")
+class BackfillRollupsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = User.objects.create_user("customer@example.com", "Secret-123")
+        cls.staff = User.objects.create_user("staff@example.com", "Secret-123", role="support_staff")
+
+    def backfill(self):
+        since = (timezone.now() - timedelta(days=1)).date().isoformat()
+        call_command("backfill_rollups", since=since, stdout=io.StringIO())
+
+    def test_rebuilds_counts_over_stale_rows(self):
+        for status in ("submitted", "resolved"):
+            ServiceRequest.objects.create(
+                customer=self.customer, support_staff=self.staff, status=status,
+                title="Meter reading", description="Reading looks wrong",
+            )
+        StatusRollup.objects.update(created=40, resolved=30)
+
+        self.backfill()
+
+        day = StatusRollup.objects.get(
+            period="day", bucket=bucket_start(timezone.now(), "day"), support_staff_id=self.staff.id,
+        )
+        self.assertEqual((day.created, day.resolved), (2, 1))
+
+    def test_window_is_cleared_before_requests_are_read(self):
+        # The delete takes the write lock, so increments made while the
+        # window is being counted wait for the rebuild rather than being lost.
+        ServiceRequest.objects.create(customer=self.customer, title="Meter reading", description="Reading looks wrong")
+
+        with CaptureQueriesContext(connection) as context:
+            self.backfill()
+
+        statements = [query["sql"] for query in context.captured_queries]
+        rollups = StatusRollup._meta.db_table
+        requests = ServiceRequest._meta.db_table
+        delete = next(index for index, sql in enumerate(statements) if sql.startswith(f'DELETE FROM "{rollups}"'))
+        read = next(index for index, sql in enumerate(statements) if f'FROM "{requests}"' in sql)
+        self.assertLess(delete, read)
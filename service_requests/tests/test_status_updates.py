@@ -0,0 +1,80 @@
+import unittest
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from service_requests.models import ServiceRequest
+from service_requests.sharding import shard_aliases
+
+BASE = "/api/service-request"
+
+
+@unittest.skipIf(shard_aliases(), "Fixtures are created on the default database.")
+class StatusUpdateTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = User.objects.create_user("customer@example.com", "Secret-123")
+        cls.staff = User.objects.create_user("staff@example.com", "Secret-123", role="support_staff")
+        cls.other_staff = User.objects.create_user("other@example.com", "Secret-123", role="support_staff")
+
+    def setUp(self):
+        self.service_request = ServiceRequest.objects.create(
+            customer=self.customer, support_staff=self.other_staff, title="Gas smell", description="Smell near the boiler",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.staff)
+
+    def update(self, new_status, if_match=None):
+        headers = {"HTTP_IF_MATCH": if_match} if if_match is not None else {}
+        return self.client.patch(
+            f"{BASE}/update/{self.service_request.id}/", {"status": new_status}, format="json", **headers
+        )
+
+    def claim(self):
+        response = self.client.post(f"{BASE}/claim/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["id"], self.service_request.id)
+        return response
+
+    def test_claim_returns_the_etag_to_update_with(self):
+        etag = self.claim()["ETag"]
+
+        response = self.update("resolved", etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_assigned_staff_can_read_the_etag(self):
+        self.claim()
+
+        response = self.client.get(f"{BASE}/{self.service_request.id}/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.update("resolved", response["ETag"]).status_code, 200)
+
+    def test_unassigned_staff_cannot_read_the_request(self):
+        self.assertEqual(self.client.get(f"{BASE}/{self.service_request.id}/").status_code, 404)
+
+    def test_stale_etag_is_rejected(self):
+        etag = self.claim()["ETag"]
+        self.assertEqual(self.update("resolved", etag).status_code, 200)
+
+        response = self.update("pending", etag)
+
+        self.assertEqual(response.status_code, 412)
+        self.service_request.refresh_from_db()
+        self.assertEqual(self.service_request.status, "resolved")
+
+    def test_malformed_if_match_is_a_bad_request(self):
+        self.claim()
+
+        for if_match in ("garbage", '"v2"', '"1", "2"'):
+            with self.subTest(if_match=if_match):
+                self.assertEqual(self.update("resolved", if_match).status_code, 400)
+
+    def test_wildcard_and_missing_if_match_update_unconditionally(self):
+        self.claim()
+
+        self.assertEqual(self.update("resolved", "*").status_code, 200)
+        self.assertEqual(self.update("pending").status_code, 200)
@@ -0,0 +1,81 @@
+import unittest
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from service_requests.models import ServiceRequest, ServiceRequestTombstone
+from service_requests.sharding import shard_aliases
+
+SYNC_URL = "/api/service-request/sync/"
+
+
+@unittest.skipIf(shard_aliases(), "Fixtures are created on the default database.")
+@override_settings(SYNC_PAGE_SIZE=2, SYNC_CURSOR_LAG_SECONDS=30)
+class SyncTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = User.objects.create_user("customer@example.com", "Secret-123")
+        cls.staff = User.objects.create_user("staff@example.com", "Secret-123", role="support_staff")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.customer)
+
+    def create_request(self, updated_at):
+        service_request = ServiceRequest.objects.create(
+            customer=self.customer, support_staff=self.staff, title="Meter reading", description="Reading looks wrong",
+        )
+        ServiceRequest.objects.filter(id=service_request.id).update(updated_at=updated_at)
+        return service_request.id
+
+    def sync_all(self, cursor=None):
+        """Follows has_more to the last page; returns the pages and the final cursor."""
+        pages = []
+        for _ in range(10):
+            params = {"updated_since": cursor} if cursor else {}
+            data = self.client.get(SYNC_URL, params).json()
+            pages.append(data)
+            cursor = data["cursor"]
+            if not data["has_more"]:
+                return pages, cursor
+        self.fail(f"Sync did not finish: {pages}")
+
+    def test_pages_through_recent_changes(self):
+        now = timezone.now()
+        ids = [self.create_request(now - timedelta(seconds=5 - index)) for index in range(5)]
+
+        pages, cursor = self.sync_all()
+
+        self.assertEqual([[row["id"] for row in page["changed"]] for page in pages], [ids[:2], ids[2:4], ids[4:]])
+        # The last cursor trails the present, so the next sync repeats the
+        # recent changes rather than miss one that committed late.
+        pages, _ = self.sync_all(cursor)
+        self.assertEqual([row["id"] for page in pages for row in page["changed"]], ids)
+
+    def test_changes_made_at_the_same_time_stay_on_one_page(self):
+        moment = timezone.now() - timedelta(hours=1)
+        first = self.create_request(moment - timedelta(seconds=1))
+        tied = [self.create_request(moment) for _ in range(3)]
+
+        pages, _ = self.sync_all()
+
+        self.assertEqual([[row["id"] for row in page["changed"]] for page in pages], [[first], tied, []])
+
+    def test_deletions_are_sent_with_the_page_covering_them(self):
+        since = timezone.now() - timedelta(hours=2)
+        ids = [self.create_request(since + timedelta(minutes=10 * (index + 1))) for index in range(4)]
+        for request_id, minutes in ((1001, 15), (1002, 35)):
+            tombstone = ServiceRequestTombstone.objects.create(
+                request_id=request_id, customer_id=self.customer.id, support_staff_id=self.staff.id,
+            )
+            ServiceRequestTombstone.objects.filter(id=tombstone.id).update(
+                deleted_at=since + timedelta(minutes=minutes)
+            )
+
+        pages, _ = self.sync_all(since.isoformat())
+
+        self.assertEqual([[row["id"] for row in page["changed"]] for page in pages], [ids[:2], ids[2:]])
+        self.assertEqual([page["deleted"] for page in pages], [[1001], [1002]])
@@ -0,0 +1,70 @@
+import tempfile
+import unittest
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from service_requests.models import ServiceRequest
+from service_requests.sharding import shard_aliases
+
+CREATE_URL = "/api/service-request/create/"
+JPEG = b"\xff\xd8\xff\xe0" + b"\x00" * 64
+
+
+def upload_limits(**overrides):
+    return override_settings(ATTACHMENT_UPLOADS={**settings.ATTACHMENT_UPLOADS, **overrides})
+
+
+@unittest.skipIf(shard_aliases(), "Fixtures are created on the default database.")
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class AttachmentUploadTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = User.objects.create_user("customer@example.com", "Secret-123")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.customer)
+
+    def create(self, *files):
+        return self.client.post(CREATE_URL, {
+            "title": "Gas smell in kitchen",
+            "description": "Strong smell near the stove since morning",
+            "service_type": "repair",
+            "attachments": [SimpleUploadedFile(name, content) for name, content in files],
+        }, format="multipart")
+
+    def test_accepts_allowed_types(self):
+        response = self.create(("meter.jpeg", JPEG))
+
+        self.assertEqual(response.status_code, 201)
+
+    def test_rejects_files_that_are_not_an_allowed_type(self):
+        response = self.create(("meter.jpeg", b"MZ\x90\x00 not an image"))
+
+        self.assertEqual(response.status_code, 415)
+        self.assertFalse(ServiceRequest.objects.exists())
+
+    def test_rejects_empty_files(self):
+        response = self.create(("meter.jpeg", JPEG), ("empty.jpeg", b""))
+
+        self.assertEqual(response.status_code, 415)
+        self.assertIn("empty.jpeg", response.json()["detail"])
+        self.assertFalse(ServiceRequest.objects.exists())
+
+    @upload_limits(MAX_FILE_SIZE=32)
+    def test_rejects_files_over_the_size_limit(self):
+        response = self.create(("meter.jpeg", JPEG))
+
+        self.assertEqual(response.status_code, 413)
+        self.assertFalse(ServiceRequest.objects.exists())
+
+    @upload_limits(MAX_REQUEST_SIZE=512)
+    def test_rejects_requests_over_the_size_limit(self):
+        response = self.create(("meter.jpeg", JPEG), ("reading.jpeg", JPEG + b"\x00" * 512))
+
+        self.assertEqual(response.status_code, 413)
+        self.assertFalse(ServiceRequest.objects.exists())
@@ -0,0 +1,83 @@
+import io
+import json
+import unittest
+from unittest import mock
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from service_requests.management.commands.deliver_webhooks import Command
+from service_requests.models import WebhookOutbox
+from service_requests.sharding import shard_aliases
+
+
+def outbox_entry(request_id, status):
+    return WebhookOutbox.objects.create(
+        service_request_id=request_id,
+        payload={"event": "service_request.status_changed", "service_request": request_id, "status": status},
+    )
+
+
+@unittest.skipIf(shard_aliases(), "Fixtures are created on the default database.")
+@override_settings(WEBHOOKS={**settings.WEBHOOKS, "URL": "http://127.0.0.1:8765/", "SECRET": "secret"})
+class DeliverWebhooksTests(TestCase):
+    def setUp(self):
+        self.sent = []
+        self.failing = False
+        patcher = mock.patch("service_requests.webhooks.post", side_effect=self.post)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def post(self, url, body, secret, timeout):
+        if self.failing:
+            raise OSError("connection refused")
+        self.sent.append([(event["service_request"], event["status"]) for event in json.loads(body)["events"]])
+        return 204
+
+    def deliver(self):
+        call_command("deliver_webhooks", once=True, stdout=io.StringIO(), stderr=io.StringIO())
+
+    def test_older_status_retried_after_a_newer_one_is_not_sent(self):
+        older = outbox_entry(1, "in_progress")
+        self.failing = True
+        self.deliver()
+        self.failing = False
+        outbox_entry(1, "resolved")
+        self.deliver()
+        # The failed entry comes due again after backing off.
+        WebhookOutbox.objects.filter(id=older.id).update(next_attempt_at=timezone.now())
+
+        self.deliver()
+
+        self.assertEqual(self.sent, [[(1, "resolved")]])
+        self.assertFalse(WebhookOutbox.objects.filter(delivered_at__isnull=True).exists())
+
+    def test_batch_sends_the_latest_status_per_request(self):
+        outbox_entry(1, "in_progress")
+        outbox_entry(2, "in_progress")
+        outbox_entry(1, "resolved")
+
+        self.deliver()
+
+        self.assertEqual(self.sent, [[(2, "in_progress"), (1, "resolved")]])
+
+    def test_workers_claim_disjoint_batches(self):
+        for request_id in range(5):
+            outbox_entry(request_id, "pending")
+
+        first, second, third = Command()._claim(3), Command()._claim(3), Command()._claim(3)
+
+        self.assertEqual((len(first), len(second), third), (3, 2, []))
+        self.assertFalse({entry.id for entry in first} & {entry.id for entry in second})
+
+    def test_entries_out_of_attempts_are_marked_failed(self):
+        outbox_entry(1, "pending")
+        WebhookOutbox.objects.update(attempts=settings.WEBHOOKS["MAX_ATTEMPTS"] - 1)
+        self.failing = True
+
+        with self.assertLogs("service_requests", "ERROR"):
+            self.deliver()
+
+        self.assertIsNotNone(WebhookOutbox.objects.get().failed_at)
@@ -4,13 +4,25 @@ from .views import (
     delete_service_request,
     update_service_request_status,
     list_requests,
-    download_file
+    get_service_request,
+    batch_get_service_requests,
+    sync_requests,
+    claim_service_request,
+    service_request_analytics,
+    download_file,
+    download_link,
 )
 
 urlpatterns = [
     path("service-request/create/", create_service_request, name="create_service_request"),
     path("service-request/getAll/", list_requests, name="get_all_service_request_by_staff"),
+    path("service-request/<int:request_id>/", get_service_request, name="get_service_request"),
+    path("service-request/batch/", batch_get_service_requests, name="batch_get_service_requests"),
+    path("service-request/sync/", sync_requests, name="sync_service_requests"),
+    path("service-request/analytics/", service_request_analytics, name="service_request_analytics"),
+    path("service-request/claim/", claim_service_request, name="claim_service_request"),
     path("service-request/delete/<int:request_id>/", delete_service_request, name="delete_service_request"),
     path("service-request/update/<int:request_id>/", update_service_request_status, name="update_service_request"),
     path("service-request/download/<int:attachment_id>/", download_file, name="download_file"),
+    path("service-request/download/<int:attachment_id>/link/", download_link, name="download_link"),
 ]
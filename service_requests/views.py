@@ -1,5 +1,17 @@
-from django.http import  FileResponse, Http404
+import heapq
+import os
+from datetime import datetime, timedelta, timezone as dt_timezone
+from itertools import islice
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import F
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.http import content_disposition_header, parse_etags
 from rest_framework.decorators import api_view, permission_classes, parser_classes
+from rest_framework.exceptions import ParseError
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
@@ -9,8 +21,16 @@ from django.contrib.auth import get_user_model
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
+from attachments import content_store, signing
 from attachments.models import Attachment
-from .models import ServiceRequest
+from gasutility.metrics import DOWNLOAD_BYTES
+from .models import ArchivedServiceRequest, ServiceRequest, ServiceRequestTombstone
+from . import idempotency, rollups, webhooks
+from .fast_serializers import parse_fields, service_request_rows, serialize_service_request_rows
+from .sharding import (
+    MergedRows, all_shards, current_shard, fan_out, group_by_shard, on_shard_of, shard_aliases, shard_for_customer,
+    use_shard,
+)
 from .serializers import ServiceRequestSerializer
 
 User = get_user_model()
@@ -27,6 +47,61 @@ SERVICE_TYPES = [
 ]
 
 SERVICE_TYPE_CHOICES = [choice[0] for choice in SERVICE_TYPES]
+
+# Upper bound on the ids accepted by one batch get.
+BATCH_GET_MAX_IDS = 100
+
+# Upper bound on the buckets one analytics query returns, a month of hours.
+ANALYTICS_MAX_BUCKETS = 744
+
+ARCHIVED_PARAMETER = openapi.Parameter(
+    "archived",
+    openapi.IN_QUERY,
+    description="Read resolved requests moved to the archive instead of current ones",
+    type=openapi.TYPE_BOOLEAN,
+    required=False,
+)
+
+FIELDS_PARAMETER = openapi.Parameter(
+    "fields",
+    openapi.IN_QUERY,
+    description="Comma separated response fields to return, e.g. `id,title,status,updated_at` (defaults to all)",
+    type=openapi.TYPE_STRING,
+    required=False,
+)
+
+
+def etag_for(version):
+    return f'"{version}"'
+
+
+def parse_if_match(header):
+    """Returns the version named by an If-Match header, "*" for any, or None if unusable."""
+    value = header.strip()
+    if value == "*":
+        return value
+    if value.startswith("W/"):
+        value = value[2:]
+    try:
+        return int(value.strip('"'))
+    except ValueError:
+        return None
+
+
+def wants_archived(request):
+    return request.query_params.get("archived", "").lower() in ("1", "true", "yes")
+
+
+def requested_fields(request):
+    """Returns the fields named by ?fields= (see parse_fields), or None for all of them."""
+    value = request.query_params.get("fields")
+    if value is None:
+        return None
+    try:
+        return parse_fields(value)
+    except ValueError as exc:
+        raise ParseError(str(exc))
+
 @swagger_auto_schema(
     method='post',
     operation_summary="Create a service request with attachments",
@@ -40,6 +115,14 @@ SERVICE_TYPE_CHOICES = [choice[0] for choice in SERVICE_TYPES]
             type=openapi.TYPE_STRING,
             required=True,
         ),
+        openapi.Parameter(
+            "Idempotency-Key",
+            openapi.IN_HEADER,
+            description="Unique key per logical request; retries with the same key replay the first response "
+                        "instead of creating a duplicate",
+            type=openapi.TYPE_STRING,
+            required=False,
+        ),
         openapi.Parameter(
             name="attachments",
             in_=openapi.IN_FORM,
@@ -80,6 +163,10 @@ SERVICE_TYPE_CHOICES = [choice[0] for choice in SERVICE_TYPES]
         ),
         400: openapi.Response("Bad Request - Invalid data"),
         401: openapi.Response("Unauthorized - Missing or invalid token"),
+        409: openapi.Response("A request with this Idempotency-Key is still being processed"),
+        413: openapi.Response("An attachment or the whole upload is over the size limit"),
+        415: openapi.Response("An attachment is not an accepted image or PDF"),
+        422: openapi.Response("Idempotency-Key was already used for a different request"),
     },
 )
 @api_view(['POST'])
@@ -94,14 +181,56 @@ def create_service_request(request):
             status=status.HTTP_403_FORBIDDEN
         )
 
+    key = request.headers.get("Idempotency-Key")
+    if not key:
+        return _create_service_request(request)
+    if len(key) > 255:
+        return Response({"detail": "Idempotency-Key must be at most 255 characters."}, status=status.HTTP_400_BAD_REQUEST)
+
+    fingerprint = idempotency.request_fingerprint(request)
+    record, claimed = idempotency.claim_key(user, key, fingerprint)
+    if not claimed:
+        if record.fingerprint != fingerprint:
+            return Response(
+                {"detail": "Idempotency-Key was already used for a different request."},
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY
+            )
+        if record.status_code is None:
+            return Response(
+                {"detail": "A request with this Idempotency-Key is still being processed."},
+                status=status.HTTP_409_CONFLICT
+            )
+        return Response(record.response_body, status=record.status_code, headers={"Idempotent-Replayed": "true"})
+
+    try:
+        response = _create_service_request(request, record)
+    except Exception:
+        record.delete()
+        raise
+    if response.status_code != status.HTTP_201_CREATED:
+        idempotency.store_response(record, response)
+    return response
+
+
+def _create_service_request(request, idempotency_record=None):
     if 'service_type' not in request.data:
         return Response({"service_type": ["This field is required."]}, status=status.HTTP_400_BAD_REQUEST)
 
     serializer = ServiceRequestSerializer(data=request.data, context={'request': request})
 
     if serializer.is_valid():
-        service_request = serializer.save()
-        return Response(ServiceRequestSerializer(service_request).data, status=status.HTTP_201_CREATED)
+        with (
+            use_shard(shard_for_customer(request.user.id)) as alias,
+            content_store.release_on_error(),
+            transaction.atomic(using=alias),
+        ):
+            service_request = serializer.save()
+            response = Response(ServiceRequestSerializer(service_request).data, status=status.HTTP_201_CREATED)
+            if idempotency_record is not None:
+                # Stored with the request: without shards both commit or
+                # neither does, so a retry never creates it twice.
+                idempotency.store_response(idempotency_record, response)
+            return response
 
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -127,9 +256,12 @@ def create_service_request(request):
             type=openapi.TYPE_INTEGER,
             required=False,
         ),
+        ARCHIVED_PARAMETER,
+        FIELDS_PARAMETER,
     ],
     responses={
         200: openapi.Response("Service requests retrieved", ServiceRequestSerializer(many=True)),
+        400: "Unknown field requested",
         401: "Unauthorized",
     },
 )
@@ -137,17 +269,238 @@ def create_service_request(request):
 @permission_classes([IsAuthenticated])
 def list_requests(request):
     user = request.user
+    archived = wants_archived(request)
+    model = ArchivedServiceRequest if archived else ServiceRequest
     if user.role == "support_staff":
-        requests = ServiceRequest.objects.filter(support_staff=request.user)
+        requests = model.objects.filter(support_staff=request.user)
     elif user.role == "customer":
-        requests = ServiceRequest.objects.filter(customer=request.user)
+        requests = model.objects.filter(customer=request.user)
     else:
         return Response({"detail": "Unauthorized."}, status=status.HTTP_403_FORBIDDEN)
+    requests = requests.order_by("created_at", "id")
 
+    fields = requested_fields(request)
     paginator = CustomPagination()
-    paginated_requests = paginator.paginate_queryset(requests, request)
-    serializer = ServiceRequestSerializer(paginated_requests, many=True)
-    return paginator.get_paginated_response(serializer.data)
+    if archived:
+        paginated_requests = paginator.paginate_queryset(service_request_rows(requests, fields=fields), request)
+    elif user.role == "support_staff" and len(shard_aliases()) > 1:
+        # Staff are assigned requests of customers on every shard.
+        rows = MergedRows(
+            service_request_rows(requests, "created_at", fields=fields),
+            key=lambda row: (row["created_at"], row["id"]),
+            ordering=("created_at", "id"),
+        )
+        paginated_requests = paginator.paginate_queryset(rows, request)
+    else:
+        with use_shard(shard_for_customer(user.id) if user.role == "customer" else all_shards()[0]):
+            paginated_requests = paginator.paginate_queryset(service_request_rows(requests, fields=fields), request)
+    return paginator.get_paginated_response(serialize_service_request_rows(paginated_requests, archived, fields))
+
+
+def sync_order(row):
+    return row["updated_at"], row["id"]
+
+
+@swagger_auto_schema(
+    method="get",
+    operation_summary="Sync service requests",
+    operation_description="Returns the service requests of the logged-in customer or assigned support staff that changed "
+                          "after `updated_since`, plus the ids of requests deleted since then (or, for support staff, "
+                          "claimed by someone else). Omit `updated_since` "
+                          "for a full sync and pass the returned `cursor` on the next call. At most "
+                          "`SYNC_PAGE_SIZE` changes are returned at once; call again with the new cursor while "
+                          "`has_more` is true. Changes made shortly before the cursor may be returned again.\n\n"
+                          "🔹 **Authorization Required**: Use the format `Bearer <your_token>` in the header.",
+    manual_parameters=[
+        openapi.Parameter(
+            "Authorization",
+            openapi.IN_HEADER,
+            description="**Format**: Bearer <your_token>",
+            type=openapi.TYPE_STRING,
+            required=True,
+        ),
+        openapi.Parameter(
+            "updated_since",
+            openapi.IN_QUERY,
+            description="ISO 8601 cursor returned by the previous sync",
+            type=openapi.TYPE_STRING,
+            format=openapi.FORMAT_DATETIME,
+            required=False,
+        ),
+    ],
+    responses={
+        200: "Changed requests, deleted request ids and the next cursor",
+        400: "Invalid cursor",
+        410: "Cursor is older than the tombstone retention window, perform a full sync",
+    },
+)
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def sync_requests(request):
+    user = request.user
+    if user.role == "support_staff":
+        requests = ServiceRequest.objects.filter(support_staff=user)
+        tombstones = ServiceRequestTombstone.objects.filter(support_staff=user)
+    elif user.role == "customer":
+        requests = ServiceRequest.objects.filter(customer=user)
+        tombstones = ServiceRequestTombstone.objects.filter(customer=user, reason="deleted")
+    else:
+        return Response({"detail": "Unauthorized."}, status=status.HTTP_403_FORBIDDEN)
+
+    now = timezone.now()
+    updated_since = request.query_params.get("updated_since")
+    if updated_since:
+        since = parse_datetime(updated_since)
+        if since is None:
+            return Response({"detail": "Invalid updated_since value."}, status=status.HTTP_400_BAD_REQUEST)
+        if timezone.is_naive(since):
+            since = timezone.make_aware(since)
+
+        retention = timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+        if since < now - retention:
+            return Response(
+                {"detail": "Cursor expired, perform a full sync."},
+                status=status.HTTP_410_GONE
+            )
+
+        requests = requests.filter(updated_at__gt=since)
+        tombstones = tombstones.filter(deleted_at__gt=since)
+    else:
+        tombstones = tombstones.none()
+
+    page_size = settings.SYNC_PAGE_SIZE
+    rows = service_request_rows(requests.order_by("updated_at", "id"))
+    deletions = tombstones.values_list("request_id", "deleted_at")
+    # A customer's requests are on one shard, a staff member's on any of them.
+    shards = all_shards() if user.role == "support_staff" else [shard_for_customer(user.id)]
+    results = fan_out(lambda: (list(rows[:page_size + 1]), list(deletions.all())), shards)
+    changed = list(islice(heapq.merge(*(changed for changed, _ in results), key=sync_order), page_size + 1))
+    deleted = sorted((row for _, shard_deletions in results for row in shard_deletions), key=lambda row: row[1])
+
+    has_more = len(changed) > page_size
+    if has_more:
+        # The next page starts after the cursor, so the page ends before the
+        # first change it leaves out, not between two made at the same time.
+        boundary = changed[page_size]["updated_at"]
+        changed = [row for row in changed[:page_size] if row["updated_at"] < boundary]
+        if not changed:
+            # A whole page changed at once; send all of it to move past it.
+            ties = fan_out(lambda: list(rows.filter(updated_at=boundary)), shards)
+            changed = sorted((row for tied in ties for row in tied), key=sync_order)
+        cursor = changed[-1]["updated_at"]
+        # Deletions after the cursor are sent with the page that covers them.
+        deleted = [(request_id, deleted_at) for request_id, deleted_at in deleted if deleted_at <= cursor]
+    else:
+        # Only the last page trails the present; trailing on every page would
+        # hand out the same page again while its rows are recent.
+        cursor = now - timedelta(seconds=settings.SYNC_CURSOR_LAG_SECONDS)
+
+    # A request claimed away and back again since the cursor is still listed.
+    changed_ids = {row["id"] for row in changed}
+    return Response({
+        "cursor": cursor.isoformat(),
+        "has_more": has_more,
+        "changed": serialize_service_request_rows(changed),
+        "deleted": [request_id for request_id, _ in deleted if request_id not in changed_ids],
+    })
+
+
+@swagger_auto_schema(
+    method="post",
+    operation_summary="Claim the next service request",
+    operation_description="Assigns the oldest pending service request matching the support staff member's skills "
+                          "to them and moves it to in progress. Safe to call concurrently: every request is "
+                          "claimed by exactly one staff member.\n\n"
+                          "🔹 **Authorization Required**: Use the format `Bearer <your_token>` in the header.",
+    manual_parameters=[
+        openapi.Parameter(
+            "Authorization",
+            openapi.IN_HEADER,
+            description="**Format**: Bearer <your_token>",
+            type=openapi.TYPE_STRING,
+            required=True,
+        )
+    ],
+    responses={
+        200: openapi.Response("Service request claimed, with its ETag for If-Match", ServiceRequestSerializer),
+        204: "No pending request to claim",
+        403: "Only support staff can claim requests",
+    },
+)
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def claim_service_request(request):
+    user = request.user
+    if user.role != "support_staff":
+        return Response({"detail": "Only support staff can claim requests."}, status=status.HTTP_403_FORBIDDEN)
+
+    candidates = ServiceRequest.objects.filter(status="pending").order_by("created_at", "id")
+    if user.skills:
+        candidates = candidates.filter(service_type__in=user.skills)
+
+    shards = all_shards()
+    if len(shards) > 1:
+        # Visit the shards in the order of their oldest claimable request.
+        oldest = fan_out(lambda: candidates.values_list("created_at", flat=True).first(), shards)
+        pending = sorted((created_at, alias) for created_at, alias in zip(oldest, shards) if created_at is not None)
+        shards = [alias for _, alias in pending]
+
+    for alias in shards:
+        with use_shard(alias):
+            claimed_id = claim_next(candidates, user)
+            if claimed_id is not None:
+                rows = list(service_request_rows(ServiceRequest.objects.filter(id=claimed_id), "version"))
+                response = Response(serialize_service_request_rows(rows)[0])
+                # Claiming bumps the version; this is the ETag to update the status with.
+                response["ETag"] = etag_for(rows[0]["version"])
+                return response
+    return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+def claim_next(candidates, user):
+    """
+    Assigns the oldest request of candidates to user and returns its id, or
+    None once there is nothing left to claim.
+
+    The claim is a single UPDATE guarded by the status and assignee just read,
+    so concurrent claims of the same row cannot both succeed. A caller that
+    loses reads the new head of the queue and tries again, so None means no
+    matching request was pending. Databases that support SKIP LOCKED hand
+    every caller a different row up front instead.
+    """
+    using = current_shard()
+    candidates = candidates.values_list("id", "customer_id", "support_staff_id", "service_type")
+    if connections[using].features.has_select_for_update_skip_locked:
+        candidates = candidates.select_for_update(skip_locked=True)
+
+    while True:
+        with transaction.atomic(using=using):
+            candidate = candidates.first()
+            if candidate is None:
+                return None
+            request_id, customer_id, previous_staff_id, service_type = candidate
+            changed_at = timezone.now()
+            claimed = ServiceRequest.objects.filter(
+                id=request_id, status="pending", support_staff_id=previous_staff_id
+            ).update(
+                support_staff=user,
+                status="in_progress",
+                updated_at=changed_at,
+                version=F("version") + 1,
+            )
+            if not claimed:
+                continue
+            if previous_staff_id not in (None, user.id):
+                # Lets the previous assignee's sync drop the request.
+                ServiceRequestTombstone.objects.create(
+                    request_id=request_id,
+                    customer_id=customer_id,
+                    support_staff_id=previous_staff_id,
+                    reason="reassigned",
+                )
+            webhooks.record_status_change(request_id, "in_progress", user.id, changed_at)
+            rollups.record_reassigned(service_type, previous_staff_id, user.id, changed_at)
+            return request_id
 
 
 @swagger_auto_schema(
@@ -162,7 +515,14 @@ def list_requests(request):
             description="**Format**: Bearer <your_token>",
             type=openapi.TYPE_STRING,
             required=True,
-        )
+        ),
+        openapi.Parameter(
+            "If-Match",
+            openapi.IN_HEADER,
+            description="ETag returned by a previous get or update; the update fails with 412 if the request changed since",
+            type=openapi.TYPE_STRING,
+            required=False,
+        ),
     ],
     request_body=openapi.Schema(
         type=openapi.TYPE_OBJECT,
@@ -177,32 +537,65 @@ def list_requests(request):
     ),
     responses={
         200: "Status updated successfully",
-        400: "Invalid status value",
+        400: "Invalid status value or If-Match header",
         404: "Request not found or unauthorized",
+        412: "The request was modified since the ETag given in If-Match",
     },
 )
 @api_view(["PATCH"])
 @permission_classes([IsAuthenticated])
+@on_shard_of("request_id")
 def update_service_request_status(request, request_id):
-    try:
-        service_request = ServiceRequest.objects.get(id=request_id, support_staff=request.user)
-    except ServiceRequest.DoesNotExist:
+    service_requests = ServiceRequest.objects.filter(id=request_id, support_staff=request.user)
+    current = service_requests.values_list("version", "status", "service_type", "created_at").first()
+    if current is None:
         return Response({"detail": "Request not found or unauthorized."}, status=status.HTTP_404_NOT_FOUND)
 
     new_status = request.data.get("status")
     if new_status not in ["pending", "in_progress", "resolved"]:
         return Response({"detail": "Invalid status value."}, status=status.HTTP_400_BAD_REQUEST)
 
-    service_request.status = new_status
-    service_request.save()
+    current_version, current_status, service_type, created_at = current
+    expected_version = current_version
+    if_match = request.headers.get("If-Match")
+    if if_match:
+        version = parse_if_match(if_match)
+        if version is None:
+            return Response({"detail": "Invalid If-Match header."}, status=status.HTTP_400_BAD_REQUEST)
+        if version != "*":
+            expected_version = version
 
-    return Response({"detail": "Status updated successfully."})
+    # Compare-and-swap: the update only applies if nobody changed the request
+    # since the version the client (or this read) saw.
+    changed_at = timezone.now()
+    with transaction.atomic(using=current_shard()):
+        # Matching the status read above keeps the rollup transition exact.
+        updated = service_requests.filter(version=expected_version, status=current_status).update(
+            status=new_status,
+            updated_at=changed_at,
+            version=F("version") + 1,
+        )
+        if updated:
+            webhooks.record_status_change(request_id, new_status, request.user.id, changed_at)
+            rollups.record_status_change(
+                created_at, service_type, request.user.id, current_status, new_status, changed_at
+            )
+    if not updated:
+        return Response(
+            {"detail": "Request was modified by someone else, fetch it again and retry."},
+            status=status.HTTP_412_PRECONDITION_FAILED
+        )
+
+    response = Response({"detail": "Status updated successfully."})
+    response["ETag"] = etag_for(expected_version + 1)
+    return response
 
 
 @swagger_auto_schema(
     method="get",
     operation_summary="Get a service request",
-    operation_description="Fetch a specific service request by ID (only if it belongs to the customer)\n\n"
+    operation_description="Fetch a specific service request by ID (only if it belongs to the customer, or is "
+                          "assigned to the support staff member). The ETag header holds its version for If-Match.\n\n"
                           "🔹 **Authorization Required**: Use the format `Bearer <your_token>` in the header.",
     manual_parameters=[
         openapi.Parameter(
@@ -212,22 +605,247 @@ def update_service_request_status(request, request_id):
             type=openapi.TYPE_STRING,
             required=True,
         ),
+        ARCHIVED_PARAMETER,
+        FIELDS_PARAMETER,
     ],
     responses={
         200: openapi.Response("Service request retrieved", ServiceRequestSerializer),
+        400: "Unknown field requested",
         404: "Request not found",
     },
 )
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@on_shard_of("request_id")
 def get_service_request(request, request_id):
-    try:
-        service_request = ServiceRequest.objects.get(id=request_id, customer=request.user)
-        serializer = ServiceRequestSerializer(service_request)
-        return Response(serializer.data)
-    except ServiceRequest.DoesNotExist:
+    archived = wants_archived(request)
+    fields = requested_fields(request)
+    model = ArchivedServiceRequest if archived else ServiceRequest
+    # Assigned staff read it too, to get the ETag their status updates need.
+    owner = "support_staff" if request.user.role == "support_staff" else "customer"
+    queryset = model.objects.filter(id=request_id, **{owner: request.user})
+    extra_fields = () if archived else ("version",)
+    rows = list(service_request_rows(queryset, *extra_fields, fields=fields))
+    data = serialize_service_request_rows(rows, archived, fields)
+    if not data:
         return Response({"detail": "Request not found."}, status=status.HTTP_404_NOT_FOUND)
 
+    response = Response(data[0])
+    if not archived:
+        response["ETag"] = etag_for(rows[0]["version"])
+    return response
+
+
+@swagger_auto_schema(
+    method="get",
+    operation_summary="Get several service requests",
+    operation_description="Fetch up to 100 service requests by ID in one call. Requests are returned in the order asked "
+                          "for if the caller is their customer or assigned support staff; other ids are listed under "
+                          "`missing` or `forbidden`.\n\n"
+                          "🔹 **Authorization Required**: Use the format `Bearer <your_token>` in the header.",
+    manual_parameters=[
+        openapi.Parameter(
+            "Authorization",
+            openapi.IN_HEADER,
+            description="**Format**: Bearer <your_token>",
+            type=openapi.TYPE_STRING,
+            required=True,
+        ),
+        openapi.Parameter(
+            "ids",
+            openapi.IN_QUERY,
+            description="Comma separated service request IDs",
+            type=openapi.TYPE_STRING,
+            required=True,
+        ),
+        ARCHIVED_PARAMETER,
+        FIELDS_PARAMETER,
+    ],
+    responses={
+        200: "Visible requests plus the ids that are missing or forbidden",
+        400: "Invalid or too many ids, or unknown field requested",
+    },
+)
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def batch_get_service_requests(request):
+    try:
+        request_ids = [int(value) for value in request.query_params.get("ids", "").split(",") if value.strip()]
+    except ValueError:
+        return Response({"detail": "ids must be a comma separated list of integers."}, status=status.HTTP_400_BAD_REQUEST)
+    request_ids = list(dict.fromkeys(request_ids))
+    if not request_ids:
+        return Response({"detail": "ids is required."}, status=status.HTTP_400_BAD_REQUEST)
+    if len(request_ids) > BATCH_GET_MAX_IDS:
+        return Response(
+            {"detail": f"At most {BATCH_GET_MAX_IDS} ids can be fetched at once."},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    archived = wants_archived(request)
+    fields = requested_fields(request)
+    model = ArchivedServiceRequest if archived else ServiceRequest
+    rows = {}
+    for alias, shard_ids in (group_by_shard(request_ids).items() if not archived else [(None, request_ids)]):
+        queryset = service_request_rows(
+            model.objects.filter(id__in=shard_ids), "customer", "support_staff", fields=fields
+        )
+        with use_shard(alias):
+            rows.update((row["id"], row) for row in queryset)
+
+    user_id = request.user.id
+    visible, missing, forbidden = [], [], []
+    for request_id in request_ids:
+        row = rows.get(request_id)
+        if row is None:
+            missing.append(request_id)
+        elif user_id in (row["customer"], row["support_staff"]):
+            visible.append(row)
+        else:
+            forbidden.append(request_id)
+
+    return Response({
+        "results": serialize_service_request_rows(visible, archived, fields),
+        "missing": missing,
+        "forbidden": forbidden,
+    })
+
+
+def parse_moment(value, name):
+    moment = parse_datetime(value)
+    if moment is None:
+        raise ParseError(f"Invalid {name} value.")
+    return timezone.make_aware(moment) if timezone.is_naive(moment) else moment
+
+
+@swagger_auto_schema(
+    method="get",
+    operation_summary="Request volume and resolution analytics",
+    operation_description="Admins only. Counts of created, resolved, reopened and deleted requests, the average time "
+                          "to resolve and the open backlog per UTC hour or day, read from rollups kept up to date as "
+                          "statuses change.\n\n"
+                          "🔹 **Authorization Required**: Use the format `Bearer <your_token>` in the header.",
+    manual_parameters=[
+        openapi.Parameter(
+            "Authorization",
+            openapi.IN_HEADER,
+            description="**Format**: Bearer <your_token>",
+            type=openapi.TYPE_STRING,
+            required=True,
+        ),
+        openapi.Parameter(
+            "period",
+            openapi.IN_QUERY,
+            description="Bucket size",
+            type=openapi.TYPE_STRING,
+            enum=rollups.PERIODS,
+            default="day",
+            required=False,
+        ),
+        openapi.Parameter(
+            "start",
+            openapi.IN_QUERY,
+            description="ISO 8601 start of the range (defaults to 30 days or 48 hours before end)",
+            type=openapi.TYPE_STRING,
+            format=openapi.FORMAT_DATETIME,
+            required=False,
+        ),
+        openapi.Parameter(
+            "end",
+            openapi.IN_QUERY,
+            description="ISO 8601 end of the range, exclusive (defaults to now)",
+            type=openapi.TYPE_STRING,
+            format=openapi.FORMAT_DATETIME,
+            required=False,
+        ),
+        openapi.Parameter(
+            "service_type",
+            openapi.IN_QUERY,
+            description="Only count requests of this service type",
+            type=openapi.TYPE_STRING,
+            enum=SERVICE_TYPE_CHOICES,
+            required=False,
+        ),
+        openapi.Parameter(
+            "support_staff",
+            openapi.IN_QUERY,
+            description="Only count requests assigned to this support staff id",
+            type=openapi.TYPE_INTEGER,
+            required=False,
+        ),
+    ],
+    responses={
+        200: "Counters and backlog per bucket, and totals over the range",
+        400: "Invalid period, range or filter",
+        403: "Only admins can read analytics",
+    },
+)
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def service_request_analytics(request):
+    if request.user.role != "admin":
+        return Response({"detail": "Only admins can read analytics."}, status=status.HTTP_403_FORBIDDEN)
+
+    params = request.query_params
+    period = params.get("period", "day")
+    if period not in rollups.PERIODS:
+        return Response({"detail": "period must be hour or day."}, status=status.HTTP_400_BAD_REQUEST)
+    end = parse_moment(params["end"], "end") if "end" in params else timezone.now()
+    if "start" in params:
+        start = parse_moment(params["start"], "start")
+    else:
+        start = end - (timedelta(days=30) if period == "day" else timedelta(hours=48))
+    buckets = list(rollups.bucket_range(start, end, period))
+    if not buckets:
+        return Response({"detail": "start must be before end."}, status=status.HTTP_400_BAD_REQUEST)
+    if len(buckets) > ANALYTICS_MAX_BUCKETS:
+        return Response(
+            {"detail": f"At most {ANALYTICS_MAX_BUCKETS} buckets can be read at once, use a longer period."},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    filters = {}
+    if "service_type" in params:
+        if params["service_type"] not in SERVICE_TYPE_CHOICES:
+            return Response({"detail": "Invalid service_type value."}, status=status.HTTP_400_BAD_REQUEST)
+        filters["service_type"] = params["service_type"]
+    if "support_staff" in params:
+        try:
+            filters["support_staff_id"] = int(params["support_staff"])
+        except ValueError:
+            return Response({"detail": "Invalid support_staff value."}, status=status.HTTP_400_BAD_REQUEST)
+
+    totals, backlog = rollups.summarize(period, start, end, **filters)
+    overall = dict.fromkeys(rollups.COUNTERS, 0)
+    results = []
+    for bucket in buckets:
+        counters = totals.get(bucket, dict.fromkeys(rollups.COUNTERS, 0))
+        for field in rollups.COUNTERS:
+            overall[field] += counters[field]
+        backlog += rollups.open_change(counters)
+        results.append({"bucket": bucket.isoformat(), **_analytics_counters(counters), "backlog": backlog})
+
+    return Response({
+        "period": period,
+        "start": buckets[0].isoformat(),
+        "end": end.isoformat(),
+        "totals": _analytics_counters(overall),
+        "buckets": results,
+    })
+
+
+def _analytics_counters(counters):
+    resolved = counters["resolved"]
+    return {
+        "created": counters["created"],
+        "resolved": resolved,
+        "reopened": counters["reopened"],
+        "deleted": counters["deleted"],
+        "reassigned_in": counters["reassigned_in"],
+        "reassigned_out": counters["reassigned_out"],
+        "average_resolution_seconds": counters["resolution_seconds"] / resolved if resolved else None,
+    }
+
 
 @swagger_auto_schema(
     method="delete",
@@ -251,6 +869,7 @@ def get_service_request(request, request_id):
 )
 @api_view(["DELETE"])
 @permission_classes([IsAuthenticated])
+@on_shard_of("request_id")
 def delete_service_request(request, request_id):
     try:
         service_request = ServiceRequest.objects.get(id=request_id, customer=request.user)
@@ -263,10 +882,17 @@ def delete_service_request(request, request_id):
             status=status.HTTP_400_BAD_REQUEST
         )
 
-    for attachment in service_request.attachments.all():
-        attachment.delete()
+    with transaction.atomic(using=current_shard()):
+        ServiceRequestTombstone.objects.create(
+            request_id=service_request.id,
+            customer_id=service_request.customer_id,
+            support_staff_id=service_request.support_staff_id,
+        )
+        rollups.record_deleted(service_request, timezone.now())
+        for attachment in service_request.attachments.all():
+            attachment.delete()
 
-    service_request.delete()
+        service_request.delete()
     return Response({"detail": "Request deleted successfully."}, status=status.HTTP_204_NO_CONTENT)
 
 
@@ -295,24 +921,92 @@ openapi.Parameter(
         )
     ],
     responses={
-        200: "File download successful",
+        200: "File download successful. HEAD returns the size, type and SHA-256 ETag without reading the file",
+        304: "The file matches the If-None-Match ETag",
         403: "You do not have permission to download this file",
         404: "Attachment not found",
     },
 )
-@api_view(["GET"])
+@api_view(["GET", "HEAD"])
 @permission_classes([IsAuthenticated])
+@on_shard_of("attachment_id")
 def download_file(request, attachment_id):
     try:
-        attachment = Attachment.objects.get(id=attachment_id)
-        service_request = attachment.service_request
-        if request.user != service_request.customer and request.user != service_request.support_staff:
-            return Response({"error": "You do not have permission to download this file."}, status=status.HTTP_403_FORBIDDEN)
-
-        file_path = attachment.file.path
-        return FileResponse(open(file_path, "rb"), as_attachment=True)
-
+        attachment = Attachment.objects.select_related("service_request").get(id=attachment_id)
     except Attachment.DoesNotExist:
         return Response({"error": "Attachment not found"}, status=status.HTTP_404_NOT_FOUND)
+
+    service_request = attachment.service_request
+    if request.user.id not in (service_request.customer_id, service_request.support_staff_id):
+        return Response({"error": "You do not have permission to download this file."}, status=status.HTTP_403_FORBIDDEN)
+
+    filename = attachment.original_name or os.path.basename(attachment.file.name)
+    # Attachments stored before content hashing have no recorded metadata and
+    # are always served from storage.
+    etag = f'"{attachment.sha256}"' if attachment.sha256 else None
+    if etag:
+        if etag in parse_etags(request.headers.get("If-None-Match", "")):
+            response = HttpResponseNotModified()
+            response["ETag"] = etag
+            return response
+        if request.method == "HEAD":
+            response = HttpResponse(content_type=attachment.content_type)
+            response["Content-Length"] = attachment.size
+            response["Content-Disposition"] = content_disposition_header(True, filename)
+            response["ETag"] = etag
+            return response
+
+    try:
+        file = attachment.file.storage.open(attachment.file.name, "rb")
     except FileNotFoundError:
         raise Http404("File not found")
+    response = FileResponse(file, as_attachment=True, filename=filename, content_type=attachment.content_type or None)
+    if etag:
+        response["ETag"] = etag
+    if request.method == "GET":
+        DOWNLOAD_BYTES.inc(int(response.get("Content-Length", 0)))
+    return response
+
+
+@swagger_auto_schema(
+    method="get",
+    operation_summary="Get a signed download link for an attachment",
+    operation_description="Returns a URL for the attachment that works without authentication until it expires, so "
+                          "the file can be fetched from a static file server, CDN or the object store directly. "
+                          "The same permissions apply as for downloading.\n\n"
+                          "🔹 **Authorization Required**: Use the format `Bearer <your_token>` in the header.",
+    manual_parameters=[
+        openapi.Parameter(
+            "Authorization",
+            openapi.IN_HEADER,
+            description="**Format**: Bearer <your_token>",
+            type=openapi.TYPE_STRING,
+            required=True,
+        ),
+    ],
+    responses={
+        200: "The signed URL and its expiry",
+        403: "You do not have permission to download this file",
+        404: "Attachment not found",
+    },
+)
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+@on_shard_of("attachment_id")
+def download_link(request, attachment_id):
+    try:
+        attachment = Attachment.objects.select_related("service_request").get(id=attachment_id)
+    except Attachment.DoesNotExist:
+        return Response({"error": "Attachment not found"}, status=status.HTTP_404_NOT_FOUND)
+
+    service_request = attachment.service_request
+    if request.user.id not in (service_request.customer_id, service_request.support_staff_id):
+        return Response({"error": "You do not have permission to download this file."}, status=status.HTTP_403_FORBIDDEN)
+
+    url, expires = signing.download_url(
+        attachment.file.name,
+        attachment.original_name or os.path.basename(attachment.file.name),
+        attachment.content_type,
+        request,
+    )
+    return Response({"url": url, "expires_at": datetime.fromtimestamp(expires, dt_timezone.utc).isoformat()})
@@ -0,0 +1,65 @@
+import hashlib
+import hmac
+import random
+import urllib.request
+from datetime import timedelta
+
+from django.conf import settings
+
+from .models import WebhookOutbox
+
+STATUS_CHANGED = "service_request.status_changed"
+SIGNATURE_HEADER = "X-Webhook-Signature"
+
+
+def record_status_change(request_id, status, support_staff_id, changed_at):
+    """
+    Queues a webhook for a status change. Call it inside the transaction that
+    made the change so the event is stored if and only if the change is.
+    Nothing is recorded while WEBHOOKS["URL"] is unset.
+    """
+    if not settings.WEBHOOKS["URL"]:
+        return
+    WebhookOutbox.objects.create(
+        service_request_id=request_id,
+        payload={
+            "event": STATUS_CHANGED,
+            "service_request": request_id,
+            "status": status,
+            "support_staff": support_staff_id,
+            "changed_at": changed_at.isoformat(),
+        },
+    )
+
+
+def coalesce(entries):
+    """Keeps the latest event per service request from outbox entries ordered by id."""
+    latest = {}
+    for entry in entries:
+        latest[entry.service_request_id] = entry.payload
+    return list(latest.values())
+
+
+def retry_delay(attempts):
+    """Exponential backoff with jitter after the given number of failed attempts."""
+    config = settings.WEBHOOKS
+    delay = min(config["BACKOFF_MAX"], config["BACKOFF_BASE"] * 2 ** max(attempts - 1, 0))
+    return timedelta(seconds=delay * random.uniform(0.5, 1.0))
+
+
+def sign(body, secret):
+    return "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+def verify(body, signature, secret):
+    return hmac.compare_digest(sign(body, secret), signature or "")
+
+
+def post(url, body, secret, timeout):
+    """POSTs a signed JSON body, raising OSError (including HTTPError and URLError) on failure."""
+    request = urllib.request.Request(url, data=body, method="POST", headers={
+        "Content-Type": "application/json",
+        SIGNATURE_HEADER: sign(body, secret),
+    })
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return response.status